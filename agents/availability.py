@@ -0,0 +1,146 @@
+import json
+import os
+import threading
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from utils.cache import normalize_key
+from utils.logger import logger
+
+EPOCH = datetime(1970, 1, 1)
+
+def to_epoch_minutes(value):
+    """
+    Accepts minutes since the epoch, a datetime, or a 'YYYY-MM-DD HH:MM' / ISO string.
+    """
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.strip().replace(' ', 'T', 1))
+    if value.tzinfo is not None:
+        value = value.replace(tzinfo=None)
+    return int((value - EPOCH).total_seconds() // 60)
+
+def from_epoch_minutes(minutes):
+    return EPOCH + timedelta(minutes=minutes)
+
+class _VenueIntervals:
+    """
+    Disjoint, sorted busy intervals for one venue, kept as two parallel arrays so
+    overlap queries are a binary search instead of a scan.
+    """
+    __slots__ = ('starts', 'ends')
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+
+    def add(self, start, end):
+        # merge with every interval that overlaps or touches [start, end)
+        lo = bisect_left(self.ends, start)
+        hi = bisect_right(self.starts, end)
+        if lo < hi:
+            start = min(start, self.starts[lo])
+            end = max(end, self.ends[hi - 1])
+        self.starts[lo:hi] = [start]
+        self.ends[lo:hi] = [end]
+
+    def is_free(self, start, end):
+        i = bisect_right(self.ends, start)
+        return i == len(self.starts) or self.starts[i] >= end
+
+    def free_windows(self, start, end, duration):
+        i = bisect_right(self.ends, start)
+        cursor = start
+        while i < len(self.starts) and self.starts[i] < end:
+            if self.starts[i] - cursor >= duration:
+                yield cursor, self.starts[i]
+            cursor = max(cursor, self.ends[i])
+            i += 1
+        if end - cursor >= duration:
+            yield cursor, end
+
+class BookingStore:
+    """
+    Existing bookings per venue. Queries cost O(log n) per venue, plus the number of
+    bookings inside the requested window for free_windows().
+    """
+    def __init__(self):
+        self._venues = {}
+        self._lock = threading.RLock()
+
+    def add_booking(self, venue, start, end):
+        start, end = to_epoch_minutes(start), to_epoch_minutes(end)
+        if end <= start:
+            raise ValueError('Booking end must be after start')
+        with self._lock:
+            self._venues.setdefault(normalize_key(venue), _VenueIntervals()).add(start, end)
+
+    def add_bookings(self, bookings):
+        for booking in bookings:
+            self.add_booking(booking['venue'], booking['start'], booking['end'])
+        return len(bookings)
+
+    def is_free(self, venue, start, end):
+        intervals = self._venues.get(normalize_key(venue))
+        if intervals is None:
+            return True
+        with self._lock:
+            return intervals.is_free(to_epoch_minutes(start), to_epoch_minutes(end))
+
+    def free_windows(self, venue, start, end, duration_minutes):
+        """
+        Returns the free windows of at least duration_minutes between start and end,
+        as (start, end) datetime pairs.
+        """
+        start, end = to_epoch_minutes(start), to_epoch_minutes(end)
+        intervals = self._venues.get(normalize_key(venue))
+        if intervals is None:
+            windows = [(start, end)] if end - start >= duration_minutes else []
+        else:
+            with self._lock:
+                windows = list(intervals.free_windows(start, end, duration_minutes))
+        return [(from_epoch_minutes(s), from_epoch_minutes(e)) for s, e in windows]
+
+    def filter_offsets(self, venue, offsets):
+        """
+        Yields the (start, end) epoch-minute pairs from offsets that do not clash with a booking.
+        """
+        intervals = self._venues.get(normalize_key(venue))
+        if intervals is None:
+            yield from offsets
+            return
+        for start, end in offsets:
+            if intervals.is_free(start, end):
+                yield start, end
+
+    def load(self, path):
+        """
+        Bulk import from a JSON array or JSONL file of {"venue", "start", "end"} records.
+        """
+        with open(path, encoding='utf-8') as f:
+            text = f.read()
+        if text.lstrip().startswith('['):
+            bookings = json.loads(text)
+        else:
+            bookings = [json.loads(line) for line in text.splitlines() if line.strip()]
+        added = self.add_bookings(bookings)
+        logger.info(f"Loaded {added} bookings from '{path}'")
+        return added
+
+_booking_store = None
+_booking_store_lock = threading.Lock()
+
+def get_booking_store():
+    """
+    Returns the process-wide booking store, bulk-loaded from BOOKINGS_PATH if set.
+    """
+    global _booking_store
+    if _booking_store is None:
+        with _booking_store_lock:
+            if _booking_store is None:
+                store = BookingStore()
+                path = os.getenv('BOOKINGS_PATH')
+                if path and os.path.exists(path):
+                    store.load(path)
+                _booking_store = store
+    return _booking_store
@@ -0,0 +1,213 @@
+from bisect import bisect_right
+from agents.event_scheduler import (
+    SlotRange, preferred_window, EVENT_WINDOWS, DEFAULT_WORK_START, DEFAULT_WORK_END,
+    MINUTES_PER_DAY, _to_minutes
+)
+from utils.cache import normalize_key
+from utils.logger import logger
+
+REPAIR_CANDIDATE_LIMIT = 200
+REPAIR_MOVE_LIMIT = 10
+
+class _Calendar:
+    """
+    Non-overlapping assignments for one venue, sorted by start. Because intervals never
+    overlap their ends are sorted too, so a clash check is one binary search.
+    """
+    __slots__ = ('starts', 'ends', 'owners')
+
+    def __init__(self):
+        self.starts = []
+        self.ends = []
+        self.owners = []
+
+    def blockers(self, start, end):
+        i = bisect_right(self.ends, start)
+        found = []
+        while i < len(self.starts) and self.starts[i] < end:
+            found.append(self.owners[i])
+            i += 1
+        return found
+
+    def is_free(self, start, end):
+        i = bisect_right(self.ends, start)
+        return i == len(self.starts) or self.starts[i] >= end
+
+    def add(self, start, end, owner):
+        i = bisect_right(self.starts, start)
+        self.starts.insert(i, start)
+        self.ends.insert(i, end)
+        self.owners.insert(i, owner)
+
+    def remove(self, start, owner):
+        i = bisect_right(self.starts, start) - 1
+        while i >= 0 and self.starts[i] == start:
+            if self.owners[i] == owner:
+                del self.starts[i], self.ends[i], self.owners[i]
+                return
+            i -= 1
+
+class BatchScheduler:
+    """
+    Assigns many events to venues and slots at once without clashes.
+
+    Greedy with repair: the most constrained events are placed first, each into the
+    earliest free slot inside its preferred window (lunch, dinner, date evening, as in
+    slot_selection_tool) on the least loaded allowed venue, falling back to any working
+    hour. An event that still does not fit tries to move a single blocking event
+    elsewhere before it is reported as unassigned.
+    """
+    def __init__(self, venues, start_date, end_date=None, work_start=DEFAULT_WORK_START,
+                 work_end=DEFAULT_WORK_END, step_minutes=60, availability=None):
+        self.venues = list(venues)
+        self.start_date = start_date
+        self.end_date = end_date or start_date
+        self.work_start = work_start
+        self.work_end = work_end
+        self.step_minutes = step_minutes
+        self.availability = availability
+        self._calendars = {normalize_key(v): _Calendar() for v in self.venues}
+        self._load = {normalize_key(v): 0 for v in self.venues}
+        self._placed = {}
+
+    def _event_window(self, event):
+        window = event.get('window')
+        if isinstance(window, str):
+            return EVENT_WINDOWS.get(window.lower())
+        if window:
+            return tuple(window)
+        return preferred_window(event.get('event_name') or event.get('name'))
+
+    def _allowed_venues(self, event):
+        allowed = event.get('venues')
+        if not allowed:
+            return self.venues
+        allowed_keys = {normalize_key(v) for v in allowed}
+        return [v for v in self.venues if normalize_key(v) in allowed_keys]
+
+    def _slot_range(self, event):
+        return SlotRange(
+            event.get('start_date') or self.start_date,
+            event.get('end_date') or event.get('start_date') or self.end_date,
+            _to_minutes(event.get('duration_hours', 1)),
+            self.work_start, self.work_end,
+            self.step_minutes,
+        )
+
+    def _candidates(self, event, venues):
+        """
+        Yields (venue, start, end, preferred) with preferred-window slots first, earliest
+        first, and venues ordered by current load within each slot.
+        """
+        window = self._event_window(event)
+        slot_range = self._slot_range(event)
+        passes = (True, False) if window else (True,)
+        for preferred in passes:
+            for start, end in slot_range.iter_offsets():
+                if window:
+                    hour = (start % MINUTES_PER_DAY) / 60
+                    if (window[0] <= hour < window[1]) != preferred:
+                        continue
+                for venue in sorted(venues, key=lambda v: self._load[normalize_key(v)]):
+                    if self.availability is not None and not self.availability.is_free(venue, start, end):
+                        continue
+                    yield venue, start, end, preferred
+
+    def _option_count(self, event, venues):
+        window = self._event_window(event)
+        slot_range = self._slot_range(event)
+        if window is None or slot_range.per_day == 0:
+            return len(slot_range) * len(venues)
+        per_day = sum(
+            1 for k in range(slot_range.per_day)
+            if window[0] <= (slot_range.work_start + k * slot_range.step) / 60 < window[1]
+        )
+        return per_day * slot_range.days * len(venues)
+
+    def _place(self, idx, venue, start, end, preferred):
+        key = normalize_key(venue)
+        self._calendars[key].add(start, end, idx)
+        self._load[key] += 1
+        self._placed[idx] = (venue, start, end, preferred)
+
+    def _unplace(self, idx):
+        venue, start, _, _ = self._placed.pop(idx)
+        key = normalize_key(venue)
+        self._calendars[key].remove(start, idx)
+        self._load[key] -= 1
+
+    def _try_place(self, idx, event, venues, exclude=None):
+        for venue, start, end, preferred in self._candidates(event, venues):
+            if (venue, start) == exclude:
+                continue
+            if self._calendars[normalize_key(venue)].is_free(start, end):
+                self._place(idx, venue, start, end, preferred)
+                return True
+        return False
+
+    def _repair(self, idx, event, venues, events):
+        moves = 0
+        for n, (venue, start, end, preferred) in enumerate(self._candidates(event, venues)):
+            if n >= REPAIR_CANDIDATE_LIMIT or moves >= REPAIR_MOVE_LIMIT:
+                break
+            blockers = self._calendars[normalize_key(venue)].blockers(start, end)
+            if len(blockers) != 1:
+                continue
+            moves += 1
+            other = blockers[0]
+            old = self._placed[other]
+            self._unplace(other)
+            # reserve the freed slot so the moved event cannot land back on it
+            self._place(idx, venue, start, end, preferred)
+            if self._try_place(other, events[other], self._allowed_venues(events[other]), exclude=(old[0], old[1])):
+                return True
+            self._unplace(idx)
+            self._place(other, *old)
+        return False
+
+    def schedule(self, events):
+        """
+        Args:
+            events (list): dicts with 'event_name' (or 'name'), 'duration_hours' and optionally
+                'start_date'/'end_date', 'venues' (allowed venue names) and 'window'
+                ('lunch', 'dinner', 'date' or a (from_hour, to_hour) pair).
+
+        Returns:
+            dict: 'assignments' in input order and the indexes of 'unassigned' events.
+        """
+        order = sorted(
+            range(len(events)),
+            key=lambda i: (self._option_count(events[i], self._allowed_venues(events[i])),
+                           -_to_minutes(events[i].get('duration_hours', 1))),
+        )
+        unassigned = []
+        for idx in order:
+            event = events[idx]
+            venues = self._allowed_venues(event)
+            if not venues:
+                unassigned.append(idx)
+                continue
+            if not self._try_place(idx, event, venues) and not self._repair(idx, event, venues, events):
+                unassigned.append(idx)
+
+        assignments = []
+        for idx, event in enumerate(events):
+            if idx not in self._placed:
+                continue
+            venue, start, end, preferred = self._placed[idx]
+            slot = SlotRange.format_slot(start, end)
+            assignments.append({
+                'index': idx,
+                'event_name': event.get('event_name') or event.get('name'),
+                'venue': venue,
+                'preferred_window': preferred,
+                **slot
+            })
+
+        logger.info(f"Batch scheduled {len(assignments)}/{len(events)} events across {len(self.venues)} venues")
+        return {'assignments': assignments, 'unassigned': sorted(unassigned)}
+
+def schedule_batch(events, venues, start_date, end_date=None, work_start=DEFAULT_WORK_START,
+                   work_end=DEFAULT_WORK_END, step_minutes=60, availability=None):
+    scheduler = BatchScheduler(venues, start_date, end_date, work_start, work_end, step_minutes, availability)
+    return scheduler.schedule(events)
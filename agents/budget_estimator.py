@@ -1,14 +1,74 @@
-def estimate_budget(number_of_people: int, place_name: str = "Generic Cafe"):
+import zlib
+import numpy as np
+
+# Average spend per person (INR) by LocationIQ venue type, then by category.
+TYPE_COST_PER_PERSON = {
+    "fast_food": 200,
+    "cafe": 250,
+    "ice_cream": 150,
+    "food_court": 220,
+    "restaurant": 450,
+    "pub": 600,
+    "bar": 700,
+    "biergarten": 650,
+    "nightclub": 900,
+}
+CATEGORY_COST_PER_PERSON = {
+    "catering": 350,
+    "amenity": 350,
+    "shop": 200,
+    "leisure": 500,
+    "tourism": 600,
+}
+DEFAULT_COST_PER_PERSON = 300
+PRICE_SPREAD = 0.25
+ROUND_TO = 10
+
+def _base_costs(types, categories):
+    return np.array([
+        TYPE_COST_PER_PERSON.get(t, CATEGORY_COST_PER_PERSON.get(c, DEFAULT_COST_PER_PERSON))
+        for t, c in zip(types, categories)
+    ], dtype=np.float64)
+
+def estimate_budgets(venues, number_of_people, seed=0):
     """
-    Returns estimated total and per person budget.
+    Estimates budgets for many venues in one pass.
+
+    The per-person cost is a base price for the venue's type/category, varied by up to
+    PRICE_SPREAD with a factor derived from a hash of (seed, venue name). The same venue,
+    headcount and seed always give the same estimate, wherever it appears in the list.
+
+    Args:
+        venues (list): Venue dicts (as returned by find_places) or plain venue names.
+        number_of_people (int): Number of attendees.
+        seed (int, optional): Changes the price variation. Defaults to 0.
+
+    Returns:
+        list: One dict per venue with place_name, currency, total_budget and per_person_cost.
     """
-    import random
+    venues = [v if isinstance(v, dict) else {"name": v} for v in venues]
+    if not venues:
+        return []
+    names = [str(v.get("name") or "") for v in venues]
+    types = [(v.get("type") or "").lower() for v in venues]
+    categories = [(v.get("category") or "").lower() for v in venues]
 
-    avg_cost_per_person = random.randint(100, 500)
-    total_budget = avg_cost_per_person * number_of_people
+    hashes = np.array([zlib.crc32(f"{seed}:{name.lower()}".encode("utf-8")) for name in names], dtype=np.float64)
+    variation = 1.0 + PRICE_SPREAD * (2.0 * hashes / 2**32 - 1.0)
+    per_person = np.round(_base_costs(types, categories) * variation / ROUND_TO).astype(np.int64) * ROUND_TO
+    totals = per_person * int(number_of_people)
 
-    return {
+    return [{
+        "place_name": name,
         "currency": "INR",
-        "total_budget": total_budget,
-        "per_person_cost": avg_cost_per_person
-    }
+        "total_budget": int(total),
+        "per_person_cost": int(cost)
+    } for name, total, cost in zip(names, totals, per_person)]
+
+def estimate_budget(number_of_people: int, place_name: str = "Generic Cafe", seed: int = 0):
+    """
+    Returns estimated total and per person budget.
+    """
+    estimate = estimate_budgets([place_name], number_of_people, seed)[0]
+    estimate.pop("place_name")
+    return estimate
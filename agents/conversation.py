@@ -0,0 +1,62 @@
+import json
+
+SYSTEM_PROMPT = "You are an event planning assistant."
+HISTORY_WINDOW = 4
+SUMMARY_MAX_CHARS = 1500
+SUMMARY_ANSWER_CHARS = 160
+
+def plan_context(event_details=None, venues=None, selected_slot=None, budgets=None):
+    """
+    Compact, single-line JSON description of the current plan for the chat prompt.
+    """
+    plan = {}
+    if event_details:
+        plan["event"] = {k: event_details.get(k) for k in (
+            "event_name", "start_date", "end_date", "duration_hours", "location", "number_of_people"
+        ) if event_details.get(k) is not None}
+    if venues:
+        plan["venues"] = [(v.get("name") or "").split(",")[0] for v in venues]
+    if selected_slot:
+        plan["slot"] = f"{selected_slot['date']} {selected_slot['start_time']}-{selected_slot['end_time']}"
+    if budgets:
+        plan["budgets"] = {(b.get("place_name") or "").split(",")[0]: b.get("total_budget") for b in budgets}
+    return json.dumps(plan, separators=(",", ":")) if plan else ""
+
+def _summarize_turn(turn):
+    answer = " ".join(turn["assistant"].split())
+    if len(answer) > SUMMARY_ANSWER_CHARS:
+        answer = answer[:SUMMARY_ANSWER_CHARS].rsplit(" ", 1)[0] + "..."
+    return f"Q: {turn['user']} A: {answer}"
+
+def roll_history(history, summary="", window=HISTORY_WINDOW):
+    """
+    Keeps the last `window` turns verbatim and folds older ones into a running summary.
+
+    Returns:
+        (recent_turns, summary): the turns to send as-is and the updated summary text.
+    """
+    if len(history) <= window:
+        return list(history), summary
+    older, recent = history[:-window], history[-window:]
+    lines = [line for line in summary.split("\n") if line]
+    lines.extend(_summarize_turn(turn) for turn in older)
+    while lines and len("\n".join(lines)) > SUMMARY_MAX_CHARS:
+        lines.pop(0)
+    return list(recent), "\n".join(lines)
+
+def build_chat_messages(user_input, history=None, summary="", plan=""):
+    """
+    Builds the message list: system prompt, current plan, summary of older turns,
+    the recent turns verbatim and the new question.
+    """
+    system = SYSTEM_PROMPT
+    if plan:
+        system += f"\nCurrent plan: {plan}"
+    if summary:
+        system += f"\nEarlier in this conversation:\n{summary}"
+    messages = [{"role": "system", "content": system}]
+    for h in history or []:
+        messages.append({"role": "user", "content": h["user"]})
+        messages.append({"role": "assistant", "content": h["assistant"]})
+    messages.append({"role": "user", "content": user_input})
+    return messages
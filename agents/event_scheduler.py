@@ -2,30 +2,165 @@ from utils.date_utils import validate_date_format
 from utils.logger import logger
 from datetime import datetime, timedelta
 
-def generate_feasible_slots(start_date, end_date, duration_hours):
-    slots = []
-    start = datetime.strptime(start_date, '%Y-%m-%d')
-    end = datetime.strptime(end_date, '%Y-%m-%d')
+EPOCH = datetime(1970, 1, 1)
+MINUTES_PER_DAY = 24 * 60
+DEFAULT_WORK_START = 11
+DEFAULT_WORK_END = 22
+
+# Preferred start-hour windows [from, to) per event type, shared by slot selection
+# and the batch scheduler.
+EVENT_WINDOWS = {
+    'date': (17, 24),
+    'lunch': (12, 15),
+    'dinner': (19, 24),
+}
+
+def event_type(event_name):
+    """
+    Returns the EVENT_WINDOWS key matching an event name ('date', 'lunch', 'dinner') or None.
+    """
+    name = (event_name or '').lower()
+    for keyword in EVENT_WINDOWS:
+        if keyword in name:
+            return keyword
+    return None
+
+def preferred_window(event_name):
+    """
+    Returns the (from_hour, to_hour) start window for an event name, or None if any time suits.
+    """
+    return EVENT_WINDOWS.get(event_type(event_name))
+
+def _to_minutes(value):
+    """
+    Accepts hours as a number (11, 17.5) or an 'HH:MM' string and returns minutes after midnight.
+    """
+    if isinstance(value, str):
+        hours, minutes = value.split(':')
+        return int(hours) * 60 + int(minutes)
+    return int(round(float(value) * 60))
+
+def _format_minutes(minutes):
+    return f'{minutes // 60:02d}:{minutes % 60:02d}'
+
+class SlotRange:
+    """
+    Compact, lazily evaluated set of slots between two dates.
+
+    Nothing is materialized: slot i is computed from its index as start/end offsets in
+    minutes since the epoch, so memory stays flat however long the date range is.
+    Slots are only formatted into the {'date', 'start_time', 'end_time'} dicts at the edges.
+    """
+    __slots__ = ('first_day', 'days', 'work_start', 'work_end', 'duration', 'step', 'per_day')
+
+    def __init__(self, start_date, end_date, duration_minutes, work_start=DEFAULT_WORK_START,
+                 work_end=DEFAULT_WORK_END, step_minutes=None):
+        start = datetime.strptime(start_date, '%Y-%m-%d')
+        end = datetime.strptime(end_date, '%Y-%m-%d')
+        self.first_day = (start - EPOCH).days
+        self.days = max((end - start).days + 1, 0)
+        self.work_start = _to_minutes(work_start)
+        self.work_end = _to_minutes(work_end)
+        self.duration = int(duration_minutes)
+        # back-to-back blocks by default, matching the original hourly behaviour
+        self.step = int(step_minutes) if step_minutes else self.duration
+        window = self.work_end - self.work_start
+        if self.duration <= 0 or self.step <= 0 or self.duration > window:
+            self.per_day = 0
+        else:
+            self.per_day = (window - self.duration) // self.step + 1
+
+    def __len__(self):
+        return self.days * self.per_day
+
+    def offsets(self, index):
+        """
+        Returns (start, end) of slot index as minutes since the epoch.
+        """
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError('slot index out of range')
+        day, k = divmod(index, self.per_day)
+        start = (self.first_day + day) * MINUTES_PER_DAY + self.work_start + k * self.step
+        return start, start + self.duration
+
+    def iter_offsets(self):
+        for day in range(self.first_day, self.first_day + self.days):
+            base = day * MINUTES_PER_DAY + self.work_start
+            for k in range(self.per_day):
+                start = base + k * self.step
+                yield start, start + self.duration
+
+    def as_arrays(self):
+        """
+        Returns (starts, ends) as int64 NumPy arrays of minutes since the epoch.
+        """
+        import numpy as np
+
+        days = np.arange(self.first_day, self.first_day + self.days, dtype=np.int64) * MINUTES_PER_DAY
+        within_day = self.work_start + np.arange(self.per_day, dtype=np.int64) * self.step
+        starts = (days[:, None] + within_day[None, :]).ravel()
+        return starts, starts + self.duration
+
+    @staticmethod
+    def format_slot(start, end):
+        day = EPOCH + timedelta(minutes=start)
+        return {
+            'date': day.strftime('%Y-%m-%d'),
+            'start_time': _format_minutes(start % MINUTES_PER_DAY),
+            'end_time': _format_minutes(end % MINUTES_PER_DAY)
+        }
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return self.format_slot(*self.offsets(index))
+
+    def __iter__(self):
+        for start, end in self.iter_offsets():
+            yield self.format_slot(start, end)
+
+    def to_dicts(self):
+        return list(self)
+
+    def summary(self):
+        """
+        Constant-size description of the whole range, suitable for an LLM context.
+        """
+        last_day = EPOCH + timedelta(days=self.first_day + max(self.days - 1, 0))
+        return {
+            'start_date': (EPOCH + timedelta(days=self.first_day)).strftime('%Y-%m-%d'),
+            'end_date': last_day.strftime('%Y-%m-%d'),
+            'daily_window': f'{_format_minutes(self.work_start)}-{_format_minutes(self.work_end)}',
+            'duration_minutes': self.duration,
+            'step_minutes': self.step,
+            'slots_per_day': self.per_day,
+            'count': len(self)
+        }
+
+    def iter_available(self, availability, venue):
+        """
+        Yields slot dicts that do not clash with venue's bookings in availability (a BookingStore).
+        """
+        for start, end in availability.filter_offsets(venue, self.iter_offsets()):
+            yield self.format_slot(start, end)
+
+def generate_feasible_slots(start_date, end_date, duration_hours, work_start=DEFAULT_WORK_START,
+                            work_end=DEFAULT_WORK_END, step_minutes=None, availability=None, venue=None):
+    slot_range = SlotRange(start_date, end_date, _to_minutes(duration_hours), work_start, work_end, step_minutes)
+    if availability is not None and venue:
+        return list(slot_range.iter_available(availability, venue))
+    return slot_range.to_dicts()
 
-    work_start = 11
-    work_end = 22
-
-    current_date = start
-    while current_date <= end:
-        slot_start = work_start
-        while slot_start + duration_hours <= work_end:
-            slot_end = slot_start + duration_hours
-            slots.append({
-                'date' : current_date.strftime('%Y-%m-%d'),
-                'start_time' : f'{int(slot_start):02d}:00',
-                'end_time' : f'{int(slot_end):02d}:00'
-            })
-            slot_start = slot_end
-        current_date += timedelta(days=1)
-
-    return slots
-
-def schedule_event(event_name, start_date, end_date, duration_hours):
+def schedule_event(event_name, start_date, end_date, duration_hours, work_start=DEFAULT_WORK_START,
+                   work_end=DEFAULT_WORK_END, step_minutes=None, lazy=False, availability=None, venue=None):
+    """
+    Builds the slot set for an event. With lazy=True 'slots' is a SlotRange that is
+    iterated on demand instead of a list of dicts. Passing a BookingStore as
+    availability together with a venue drops slots that clash with its bookings.
+    """
     logger.info(f'Scheduling event : {event_name} from {start_date} to {end_date} for {duration_hours} hours')
 
     if not (validate_date_format(start_date)) and (validate_date_format(end_date)):
@@ -44,7 +179,11 @@ def schedule_event(event_name, start_date, end_date, duration_hours):
         logger.error("Start date cannot be after end date.")
         return {"error": "Start date after end date"}
     
-    slots = generate_feasible_slots(start_date, end_date, duration_hours)
+    slots = SlotRange(start_date, end_date, _to_minutes(duration_hours), work_start, work_end, step_minutes)
+    if availability is not None and venue:
+        slots = list(slots.iter_available(availability, venue))
+    elif not lazy:
+        slots = slots.to_dicts()
 
     result = {
         'event' : event_name,
@@ -0,0 +1,242 @@
+import bisect
+import json
+import os
+import threading
+from collections import defaultdict
+from utils.cache import normalize_key
+from utils.logger import logger
+
+DEFAULT_GAZETTEER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "data", "gazetteer")
+COMPLETION_SCAN_LIMIT = 50
+
+def max_edits(key):
+    # roughly one typo per five characters; short names must match exactly
+    if len(key) < 4:
+        return 0
+    return 1 if len(key) < 8 else 2
+
+def bounded_edit_distance(a, b, limit):
+    """
+    Levenshtein distance between a and b, or limit + 1 as soon as it must exceed limit.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return min(previous[-1], limit + 1)
+
+class Gazetteer:
+    """
+    Locality names for one city mapped to coordinates. Names are kept in a sorted
+    array for prefix lookups and bucketed by length for bounded fuzzy matching.
+    """
+    def __init__(self, city, country=None, bbox=None, region=None):
+        self.city = city
+        self.country = country
+        self.bbox = bbox
+        self.region = region
+        self._places = {}
+        self._keys = []
+        self._by_length = defaultdict(list)
+        self._city_tokens = set(normalize_key(f"{self.context} {region or ''}").split())
+        self._learned_path = None
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._places)
+
+    @property
+    def context(self):
+        """
+        City and country as appended to free-text searches, e.g. 'Mumbai India'.
+        """
+        return " ".join(part for part in (self.city, self.country) if part)
+
+    def contains(self, lat, lon):
+        if not self.bbox:
+            return True
+        south, west, north, east = self.bbox
+        return south <= lat <= north and west <= lon <= east
+
+    def _strip_city(self, key):
+        # 'andheri west mumbai maharashtra' -> 'andheri west', but 'mumbai' stays 'mumbai'
+        tokens = key.split()
+        while len(tokens) > 1 and tokens[-1] in self._city_tokens:
+            tokens.pop()
+        return " ".join(tokens)
+
+    def add(self, name, lat, lon, canonical=None):
+        key = normalize_key(name)
+        if not key:
+            return False
+        place = {"name": canonical or name, "lat": float(lat), "lon": float(lon)}
+        with self._lock:
+            if key not in self._places:
+                bisect.insort(self._keys, key)
+                self._by_length[len(key)].append(key)
+            self._places[key] = place
+        return True
+
+    def complete(self, prefix, limit=10):
+        """
+        Canonical names of localities with a name starting with prefix, in name order.
+        """
+        key = normalize_key(prefix)
+        names = []
+        with self._lock:
+            for place in self._completions(key):
+                if place["name"] not in names:
+                    names.append(place["name"])
+                    if len(names) >= limit:
+                        break
+        return names
+
+    def _completions(self, key):
+        start = bisect.bisect_left(self._keys, key)
+        for candidate in self._keys[start:start + COMPLETION_SCAN_LIMIT]:
+            if not candidate.startswith(key):
+                break
+            yield self._places[candidate]
+
+    def match(self, query):
+        """
+        Resolves a free-text locality to {"name", "lat", "lon", "match"}, or None.
+        Trailing city, region and country names are ignored. Tried in order: the exact
+        name; the one locality a partial name completes to ('lower pa' -> 'lower parel');
+        the single closest name within max_edits ('andheri wset' -> 'andheri west').
+        A known name followed by other words ('fort kochi') is a miss, since those
+        words may place it in another city.
+        """
+        key = self._strip_city(normalize_key(query))
+        if not key:
+            return None
+        with self._lock:
+            place = self._places.get(key)
+            if place:
+                return dict(place, match="exact")
+
+            if len(key) >= 3:
+                completions = {place["name"]: place for place in self._completions(key)}
+                if len(completions) == 1:
+                    return dict(next(iter(completions.values())), match="prefix")
+
+            limit = max_edits(key)
+            best, found = limit + 1, {}
+            for length in range(len(key) - limit, len(key) + limit + 1):
+                for candidate in self._by_length.get(length, ()):
+                    distance = bounded_edit_distance(key, candidate, min(limit, best))
+                    if distance > limit:
+                        continue
+                    if distance < best:
+                        best, found = distance, {}
+                    if distance == best:
+                        place = self._places[candidate]
+                        found[place["name"]] = place
+        # a tie between different localities is a miss, not a guess
+        if len(found) == 1:
+            return dict(next(iter(found.values())), match="fuzzy")
+        return None
+
+    def lookup(self, query):
+        """
+        Returns (lat, lon) for a locality, or None when it is not known locally.
+        """
+        place = self.match(query)
+        return (place["lat"], place["lon"]) if place else None
+
+    def learn(self, name, lat, lon):
+        """
+        Adds a remotely geocoded region if it lies inside the city and is not known yet.
+        Learned names are appended to the learned file, when one is set, so they survive restarts.
+        """
+        lat, lon = float(lat), float(lon)
+        key = self._strip_city(normalize_key(name))
+        if not key or not self.contains(lat, lon):
+            return False
+        with self._lock:
+            if key in self._places:
+                return False
+            self.add(key, lat, lon, canonical=name)
+            if self._learned_path:
+                try:
+                    directory = os.path.dirname(self._learned_path)
+                    if directory:
+                        os.makedirs(directory, exist_ok=True)
+                    with open(self._learned_path, "a", encoding="utf-8") as f:
+                        f.write(json.dumps({"name": name, "key": key, "lat": lat, "lon": lon}) + "\n")
+                except OSError as e:
+                    logger.warning(f"Could not persist gazetteer entry '{name}': {e}")
+        logger.info(f"Gazetteer learned '{name}' for {self.city}")
+        return True
+
+    def load(self, path):
+        """
+        Loads a city file: {"city", "region", "country", "bbox": [south, west, north, east],
+        "localities": [{"name", "lat", "lon", "aliases": [...]}]}.
+        """
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        added = 0
+        for locality in data.get("localities", []):
+            for name in [locality["name"]] + locality.get("aliases", []):
+                added += self.add(name, locality["lat"], locality["lon"], canonical=locality["name"])
+        logger.info(f"Loaded {added} gazetteer names from '{path}'")
+        return added
+
+    def load_learned(self, path):
+        """
+        Loads names learned by earlier runs and appends new ones to the same file.
+        """
+        self._learned_path = path
+        if not os.path.exists(path):
+            return 0
+        added = 0
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    # a line cut short by an interrupted run
+                    continue
+                added += self.add(entry.get("key") or entry["name"], entry["lat"], entry["lon"], canonical=entry["name"])
+        return added
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        gazetteer = cls(data["city"], data.get("country"), data.get("bbox"), data.get("region"))
+        gazetteer.load(path)
+        return gazetteer
+
+_gazetteer = None
+_gazetteer_lock = threading.Lock()
+
+def get_gazetteer():
+    """
+    Returns the process-wide gazetteer for GAZETTEER_CITY (default 'mumbai'), read from
+    <GAZETTEER_DIR>/<city>.json plus names learned from remote geocodes. Set
+    GAZETTEER_LEARNED_PATH to an empty string to keep learned names in memory only.
+    """
+    global _gazetteer
+    if _gazetteer is None:
+        with _gazetteer_lock:
+            if _gazetteer is None:
+                city = os.getenv("GAZETTEER_CITY", "mumbai").strip().lower()
+                path = os.path.join(os.getenv("GAZETTEER_DIR", DEFAULT_GAZETTEER_DIR), f"{city}.json")
+                if os.path.exists(path):
+                    gazetteer = Gazetteer.from_file(path)
+                else:
+                    logger.warning(f"No gazetteer file for '{city}' at '{path}'; every region will be geocoded remotely.")
+                    gazetteer = Gazetteer(city.title())
+                learned = os.getenv("GAZETTEER_LEARNED_PATH", os.path.join(".cache", f"gazetteer_{city}.jsonl"))
+                if learned:
+                    gazetteer.load_learned(learned)
+                _gazetteer = gazetteer
+    return _gazetteer
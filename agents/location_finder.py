@@ -1,13 +1,47 @@
+import asyncio
 import requests
 import os
 import json
 from dotenv import load_dotenv
-import logging
-from geopy.distance import geodesic
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from utils import http_client
+from utils.geo import within_radius
+from agents.venue_store import get_venue_store
+from agents.gazetteer import get_gazetteer
+from utils.cache import TTLCache, SQLiteBackend, normalize_key, MISS
+from utils.logger import logger
+from utils.tracing import traced, current_span, increment
 
 load_dotenv()
-logging.basicConfig(level=logging.INFO)
-logger = logging.getLogger(__name__)
+
+DISTANCE_METHOD = os.getenv("DISTANCE_METHOD", "haversine")
+USE_VENUE_STORE = os.getenv("VENUE_STORE_ENABLED", "true").lower() in ("1", "true", "yes")
+USE_GAZETTEER = os.getenv("GAZETTEER_ENABLED", "true").lower() in ("1", "true", "yes")
+CONCURRENT_SEARCH = os.getenv("LOCATIONIQ_CONCURRENT", "false").lower() in ("1", "true", "yes")
+LOCATIONIQ_BASE_URL = os.getenv("LOCATIONIQ_BASE_URL", "https://us1.locationiq.com/v1").rstrip("/")
+GEOCODE_TTL_SECONDS = 30 * 24 * 3600
+GEOCODE_NEGATIVE_TTL_SECONDS = 24 * 3600
+_geocode_cache = None
+
+def get_geocode_cache():
+    """
+    Returns the process-wide geocode cache. Set GEOCODE_CACHE_PATH to an empty
+    string to keep the cache in memory only.
+    """
+    global _geocode_cache
+    if _geocode_cache is None:
+        path = os.getenv("GEOCODE_CACHE_PATH", os.path.join(".cache", "geocode.sqlite"))
+        persistent = SQLiteBackend(path, table="geocode") if path else None
+        _geocode_cache = TTLCache(
+            maxsize=int(os.getenv("GEOCODE_CACHE_SIZE", "1024")),
+            ttl=GEOCODE_TTL_SECONDS,
+            negative_ttl=GEOCODE_NEGATIVE_TTL_SECONDS,
+            persistent=persistent,
+        )
+    return _geocode_cache
+
+def geocode_cache_stats():
+    return get_geocode_cache().stats.as_dict()
 
 def get_locationiq_token():
     token = os.getenv("LOCATIONIQ_API_KEY")
@@ -15,28 +49,105 @@ def get_locationiq_token():
         raise ValueError("LOCATIONIQ_API_KEY not set in environment.")
     return token
 
-def geocode_region(region, api_key):
-    url = "https://us1.locationiq.com/v1/search.php"
-    params = {"key": api_key, "q": region, "format": "json", "limit": 1}
+def _geocode_request(region, api_key):
+    return f"{LOCATIONIQ_BASE_URL}/search.php", {"key": api_key, "q": region, "format": "json", "limit": 1}
+
+def _gazetteer_geocode(region):
+    """
+    Resolves the region from the local gazetteer; (None, None) when it is not known there.
+    """
+    if not USE_GAZETTEER:
+        return None, None
+    place = get_gazetteer().match(region)
+    current_span().set("gazetteer_hit", place is not None)
+    increment("gazetteer_total", result="hit" if place else "miss")
+    if place is None:
+        return None, None
+    logger.info(f"Gazetteer resolved region '{region}' to '{place['name']}' ({place['match']} match)")
+    return place["lat"], place["lon"]
+
+def _cached_geocode(region):
+    """
+    Returns (hit, (lat, lon)) from the geocode cache; a cached miss is (True, (None, None)).
+    """
+    cached = get_geocode_cache().get(normalize_key(region))
+    current_span().set("cache_hit", cached is not MISS)
+    increment("cache_total", cache="geocode", result="miss" if cached is MISS else "hit")
+    if cached is MISS:
+        return False, (None, None)
+    if cached is None:
+        logger.error(f"No geocode results found (cached) for '{region}'.")
+        return True, (None, None)
+    logger.info(f"Geocode cache hit for region '{region}'")
+    return True, (cached[0], cached[1])
+
+def _geocode_result(region, data):
+    cache = get_geocode_cache()
+    cache_key = normalize_key(region)
+    if data:
+        lat, lon = data[0]["lat"], data[0]["lon"]
+        logger.info(f"Geocoded region '{region}' to lat: {lat}, lon: {lon}")
+        cache.set(cache_key, [lat, lon])
+        if USE_GAZETTEER:
+            get_gazetteer().learn(region, lat, lon)
+        return lat, lon
+    logger.error(f"No geocode results found for '{region}'.")
+    cache.set_negative(cache_key)
+    return None, None
 
+def _is_not_found(response):
+    # LocationIQ answers an unknown place with 404 {"error": "Unable to geocode"}
+    if response.status_code != 404:
+        return False
     try:
-        response = requests.get(url, params=params)
-        response.raise_for_status()
-        data = response.json()
-        if data:
-            lat, lon = data[0]["lat"], data[0]["lon"]
-            logger.info(f"Geocoded region '{region}' to lat: {lat}, lon: {lon}")
-            return lat, lon
-        else:
-            logger.error("No geocode results found.")
-            return None, None
+        return "unable to geocode" in str(response.json().get("error", "")).lower()
+    except (ValueError, AttributeError):
+        return False
+
+def _geocode_response(region, response):
+    if _is_not_found(response):
+        return _geocode_result(region, [])
+    response.raise_for_status()
+    return _geocode_result(region, response.json())
+
+@traced("locationiq.geocode")
+def geocode_region(region, api_key, timeout=None):
+    lat, lon = _gazetteer_geocode(region)
+    if lat is not None:
+        return lat, lon
+
+    hit, coords = _cached_geocode(region)
+    if hit:
+        return coords
+
+    url, params = _geocode_request(region, api_key)
+    try:
+        response = http_client.get(url, params=params, timeout=timeout)
+        return _geocode_response(region, response)
     except requests.exceptions.RequestException as e:
         logger.error(f"Geocoding error: {e}")
         return None, None
 
-def nearby_search(lat, lon, api_key, query, radius=5000):
-    url = "https://us1.locationiq.com/v1/nearby.php"
-    params = {
+@traced("locationiq.geocode")
+async def ageocode_region(region, api_key, timeout=None):
+    lat, lon = _gazetteer_geocode(region)
+    if lat is not None:
+        return lat, lon
+
+    hit, coords = _cached_geocode(region)
+    if hit:
+        return coords
+
+    url, params = _geocode_request(region, api_key)
+    try:
+        response = await http_client.aget(url, params=params, timeout=timeout)
+        return _geocode_response(region, response)
+    except http_client.ASYNC_ERRORS as e:
+        logger.error(f"Geocoding error: {e}")
+        return None, None
+
+def _nearby_request(lat, lon, api_key, radius):
+    return f"{LOCATIONIQ_BASE_URL}/nearby.php", {
         "key": api_key,
         "lat": lat,
         "lon": lon,
@@ -46,74 +157,237 @@ def nearby_search(lat, lon, api_key, query, radius=5000):
         "limit": 20
     }
 
+def _with_coords(data):
+    """
+    Pairs each place with its float (lat, lon), skipping records whose coordinates are missing or malformed.
+    """
+    valid = []
+    for place in data:
+        try:
+            valid.append((place, float(place["lat"]), float(place["lon"])))
+        except (KeyError, TypeError, ValueError):
+            logger.warning(f"Skipping place with malformed coordinates: {place!r:.200}")
+    return valid
+
+def _nearby_results(lat, lon, query, radius, data, distance_method):
+    brand_results = _with_coords(
+        place for place in data if query.lower() in (place.get("name") or "").lower()
+    )
+    if brand_results:
+        _, order, _ = within_radius(
+            lat, lon,
+            [place_lat for _, place_lat, _ in brand_results],
+            [place_lon for _, _, place_lon in brand_results],
+            radius / 1000,
+            method=distance_method or DISTANCE_METHOD,
+        )
+        brand_results = [brand_results[i][0] for i in order]
+
+    current_span().set("result_count", len(brand_results))
+    if brand_results:
+        logger.info(f"Found {len(brand_results)} '{query}' results in nearby search.")
+        return [{
+            "name": place.get("name"),
+            "latitude": place.get("lat"),
+            "longitude": place.get("lon"),
+            "type": place.get("type"),
+            "category": place.get("category", "")
+        } for place in brand_results]
+    logger.warning(f"No '{query}' results found in nearby search.")
+    return []
+
+@traced("locationiq.nearby")
+def nearby_search(lat, lon, api_key, query, radius=5000, timeout=None, distance_method=None):
+    url, params = _nearby_request(lat, lon, api_key, radius)
     try:
-        response = requests.get(url, params=params)
+        response = http_client.get(url, params=params, timeout=timeout)
         response.raise_for_status()
-        data = response.json()
-        brand_results = [place for place in data if query.lower() in place.get("name", "").lower()]
-
-        if brand_results:
-            logger.info(f"Found {len(brand_results)} '{query}' results in nearby search.")
-            return [{
-                "name": place.get("name"),
-                "latitude": place.get("lat"),
-                "longitude": place.get("lon"),
-                "type": place.get("type"),
-                "category": place.get("category", "")
-            } for place in brand_results]
-        else:
-            logger.warning(f"No '{query}' results found in nearby search.")
-            return []
-
+        return _nearby_results(lat, lon, query, radius, response.json(), distance_method)
     except requests.exceptions.RequestException as e:
         logger.error(f"Nearby search error: {e}")
         return []
 
-def direct_text_search(lat, lon, api_key, query, region, radius=5000):
-    url = "https://us1.locationiq.com/v1/search.php"
-    params = {
+@traced("locationiq.nearby")
+async def anearby_search(lat, lon, api_key, query, radius=5000, timeout=None, distance_method=None):
+    url, params = _nearby_request(lat, lon, api_key, radius)
+    try:
+        response = await http_client.aget(url, params=params, timeout=timeout)
+        response.raise_for_status()
+        return _nearby_results(lat, lon, query, radius, response.json(), distance_method)
+    except http_client.ASYNC_ERRORS as e:
+        logger.error(f"Nearby search error: {e}")
+        return []
+
+def _text_search_request(api_key, query, region):
+    return f"{LOCATIONIQ_BASE_URL}/search.php", {
         "key": api_key,
-        "q": f"{query} {region} Mumbai India",
+        "q": f"{query} {region} {get_gazetteer().context}",
         "format": "json",
         "limit": 20
     }
 
+def _text_search_results(lat, lon, query, region, radius, data, distance_method):
+    valid = _with_coords(data)
+    data = [place for place, _, _ in valid]
+    lats = [place_lat for _, place_lat, _ in valid]
+    lons = [place_lon for _, _, place_lon in valid]
+    _, order, _ = within_radius(lat, lon, lats, lons, radius / 1000, method=distance_method or DISTANCE_METHOD)
+
+    results = [{
+        "name": data[i].get("display_name"),
+        "latitude": lats[i],
+        "longitude": lons[i],
+        "type": data[i].get("type"),
+        "icon": data[i].get("icon", "")
+    } for i in order]
+
+    current_span().set("result_count", len(results))
+    logger.info(f"Direct text search found {len(results)} '{query}' results within {radius/1000} km of '{region}'.")
+    return results
+
+@traced("locationiq.text_search")
+def direct_text_search(lat, lon, api_key, query, region, radius=5000, timeout=None, distance_method=None):
+    url, params = _text_search_request(api_key, query, region)
     try:
-        response = requests.get(url, params=params)
+        response = http_client.get(url, params=params, timeout=timeout)
         response.raise_for_status()
-        data = response.json()
-
-        within_radius = []
-        for place in data:
-            place_lat = float(place.get("lat"))
-            place_lon = float(place.get("lon"))
-            dist_km = geodesic((float(lat), float(lon)), (place_lat, place_lon)).km
-            if dist_km <= (radius / 1000):
-                within_radius.append({
-                    "name": place.get("display_name"),
-                    "latitude": place_lat,
-                    "longitude": place_lon,
-                    "type": place.get("type"),
-                    "icon": place.get("icon", "")
-                })
-
-        logger.info(f"Direct text search found {len(within_radius)} '{query}' results within {radius/1000} km of '{region}'.")
-        return within_radius
-
+        return _text_search_results(lat, lon, query, region, radius, response.json(), distance_method)
     except requests.exceptions.RequestException as e:
         logger.error(f"Direct text search error: {e}")
         return []
 
-def find_places(brand_name, query_type, region):
+@traced("locationiq.text_search")
+async def adirect_text_search(lat, lon, api_key, query, region, radius=5000, timeout=None, distance_method=None):
+    url, params = _text_search_request(api_key, query, region)
+    try:
+        response = await http_client.aget(url, params=params, timeout=timeout)
+        response.raise_for_status()
+        return _text_search_results(lat, lon, query, region, radius, response.json(), distance_method)
+    except http_client.ASYNC_ERRORS as e:
+        logger.error(f"Direct text search error: {e}")
+        return []
+
+_search_executor = None
+
+def _get_search_executor():
+    global _search_executor
+    if _search_executor is None:
+        _search_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="locationiq")
+    return _search_executor
+
+def race_searches(lat, lon, api_key, search_query, region, radius=5000, timeout=None):
+    """
+    Runs nearby_search and direct_text_search in parallel and returns the first
+    non-empty result. The losing call is cancelled if it has not started yet;
+    an in-flight request is left to finish in the background and its result dropped.
+    """
+    executor = _get_search_executor()
+    futures = [
+        executor.submit(nearby_search, lat, lon, api_key, search_query, radius=radius, timeout=timeout),
+        executor.submit(direct_text_search, lat, lon, api_key, search_query, region, radius=radius, timeout=timeout),
+    ]
+    try:
+        for future in as_completed(futures):
+            results = future.result()
+            if results:
+                return results
+        return []
+    finally:
+        for future in futures:
+            future.cancel()
+
+async def arace_searches(lat, lon, api_key, search_query, region, radius=5000, timeout=None):
+    """
+    Async race_searches: the first non-empty result wins and the other request is cancelled.
+    """
+    tasks = [
+        asyncio.ensure_future(anearby_search(lat, lon, api_key, search_query, radius=radius, timeout=timeout)),
+        asyncio.ensure_future(adirect_text_search(lat, lon, api_key, search_query, region, radius=radius,
+                                                  timeout=timeout)),
+    ]
+    try:
+        for next_done in asyncio.as_completed(tasks):
+            results = await next_done
+            if results:
+                return results
+        return []
+    finally:
+        for task in tasks:
+            task.cancel()
+
+def _store_lookup(lat, lon, radius, search_query, region):
+    store = get_venue_store()
+    if not store.is_covered(region, search_query, radius / 1000):
+        current_span().set("venue_store_hit", False)
+        return []
+    local = store.query(lat, lon, radius / 1000, search_query)
+    current_span().set("venue_store_hit", bool(local))
+    if local:
+        logger.info(f"Venue store answered '{search_query}' near '{region}' with {len(local)} results.")
+    return local
+
+def _store_results(results, radius, search_query, region):
+    store = get_venue_store()
+    store.add_venues(results)
+    store.mark_covered(region, search_query, radius / 1000)
+
+def find_places(brand_name, query_type, region, concurrent=None, timeout=None, use_store=None, radius=5000):
+    if concurrent is None:
+        concurrent = CONCURRENT_SEARCH
+    if use_store is None:
+        use_store = USE_VENUE_STORE
+
     api_key = get_locationiq_token()
-    lat, lon = geocode_region(region, api_key)
+    lat, lon = geocode_region(region, api_key, timeout=timeout)
     if not lat or not lon:
         logger.error("Failed to geocode region.")
         return []
 
     search_query = brand_name if brand_name else query_type
-    results = nearby_search(lat, lon, api_key, search_query)
-    if results:
-        return results
+    if use_store:
+        local = _store_lookup(lat, lon, radius, search_query, region)
+        if local:
+            return local
+
+    if concurrent:
+        results = race_searches(lat, lon, api_key, search_query, region, radius=radius, timeout=timeout)
+    else:
+        results = nearby_search(lat, lon, api_key, search_query, radius=radius, timeout=timeout)
+        if not results:
+            results = direct_text_search(lat, lon, api_key, search_query, region, radius=radius, timeout=timeout)
+
+    if use_store and results:
+        _store_results(results, radius, search_query, region)
+    return results
+
+async def afind_places(brand_name, query_type, region, concurrent=None, timeout=None, use_store=None, radius=5000):
+    """
+    Async find_places over the shared httpx pool; same lookup order and caching.
+    """
+    if concurrent is None:
+        concurrent = CONCURRENT_SEARCH
+    if use_store is None:
+        use_store = USE_VENUE_STORE
+
+    api_key = get_locationiq_token()
+    lat, lon = await ageocode_region(region, api_key, timeout=timeout)
+    if not lat or not lon:
+        logger.error("Failed to geocode region.")
+        return []
+
+    search_query = brand_name if brand_name else query_type
+    if use_store:
+        local = _store_lookup(lat, lon, radius, search_query, region)
+        if local:
+            return local
+
+    if concurrent:
+        results = await arace_searches(lat, lon, api_key, search_query, region, radius=radius, timeout=timeout)
+    else:
+        results = await anearby_search(lat, lon, api_key, search_query, radius=radius, timeout=timeout)
+        if not results:
+            results = await adirect_text_search(lat, lon, api_key, search_query, region, radius=radius, timeout=timeout)
 
-    return direct_text_search(lat, lon, api_key, search_query, region)
+    if use_store and results:
+        _store_results(results, radius, search_query, region)
+    return results
@@ -1,16 +1,17 @@
-from langchain_groq import ChatGroq
-from langchain_core.prompts import PromptTemplate
-from datetime import datetime
-import json
-import re
+from datetime import datetime, timedelta
+import os
+import threading
+from collections import Counter
 from dotenv import load_dotenv
+from agents.nlu_rules import rule_based_parse
+from utils.cache import TTLCache, SQLiteBackend, normalize_key, MISS
+from utils.logger import logger
+from utils.llm_gateway import llm_call, allm_call, PRIORITY_INTERACTIVE
+from utils.json_stream import IncrementalJSONExtractor
+from utils.tracing import current_span, increment
 
-load_dotenv()
-llm = ChatGroq(model='compound-beta')
-
-prompt_template = PromptTemplate(
-    input_variables=['current_date', 'user_input'],
-    template="""
+NLU_MODEL = 'compound-beta'
+PROMPT_TEMPLATE = """
 You are an event planner assistant. Today's date is {current_date}.
 
 Extract the following information from the user input:
@@ -27,28 +28,148 @@ Return only valid JSON without any explanation or text before or after it.
 
 User input: {user_input}
 """
-)
 
-def parse_event_prompt(user_input):
-    today = datetime.today().strftime('%Y-%m-%d')
-    prompt = prompt_template.format(current_date=today, user_input=user_input)
-    response = llm.invoke(prompt)
+_llm = None
+_llm_lock = threading.Lock()
+
+def get_llm():
+    """
+    Returns the shared ChatGroq client, built on first use so importing this module
+    does not pull in langchain_groq or require GROQ_API_KEY.
+    """
+    global _llm
+    if _llm is None:
+        with _llm_lock:
+            if _llm is None:
+                from langchain_groq import ChatGroq
+                load_dotenv()
+                # retries are owned by the shared LLM gateway
+                _llm = ChatGroq(model=NLU_MODEL, max_retries=0)
+    return _llm
+
+NLU_PATH_STATS = Counter()
+_nlu_cache = None
+
+def get_nlu_cache():
+    """
+    Returns the parse cache. NLU_CACHE_BACKEND selects 'memory' (default) or 'sqlite'
+    (stored at NLU_CACHE_PATH).
+    """
+    global _nlu_cache
+    if _nlu_cache is None:
+        backend = os.getenv("NLU_CACHE_BACKEND", "memory").lower()
+        persistent = None
+        if backend == "sqlite":
+            persistent = SQLiteBackend(os.getenv("NLU_CACHE_PATH", os.path.join(".cache", "nlu.sqlite")), table="nlu")
+        elif backend != "memory":
+            raise ValueError(f"Unknown NLU_CACHE_BACKEND: {backend}")
+        _nlu_cache = TTLCache(maxsize=int(os.getenv("NLU_CACHE_SIZE", "512")), persistent=persistent)
+    return _nlu_cache
+
+def get_nlu_stats():
+    """
+    Returns how many parses were served from cache, the rule-based path or the LLM,
+    the LLM-avoidance rate and the cache counters.
+    """
+    avoided = NLU_PATH_STATS["cache"] + NLU_PATH_STATS["rules"]
+    total = avoided + NLU_PATH_STATS["llm"]
+    return {
+        "cache": NLU_PATH_STATS["cache"],
+        "rules": NLU_PATH_STATS["rules"],
+        "llm": NLU_PATH_STATS["llm"],
+        "llm_avoidance_rate": round(avoided / total, 4) if total else 0.0,
+        "cache_stats": get_nlu_cache().stats.as_dict(),
+    }
+
+def _seconds_until_midnight(now):
+    midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+    return max((midnight - now).total_seconds(), 1.0)
+
+def _record_path(path):
+    NLU_PATH_STATS[path] += 1
+    current_span().set("nlu_path", path)
+    increment("nlu_path_total", path=path)
+    logger.info(f"NLU path: {path}")
+
+def _cache_key(user_input, reference_date):
+    return f"{reference_date.strftime('%Y-%m-%d')}|{normalize_key(user_input)}"
+
+def _cached_parse(cache_key):
+    cached = get_nlu_cache().get(cache_key)
+    if cached is not MISS and cached is not None:
+        _record_path("cache")
+        return dict(cached)
+    return None
 
+def _store_parse(cache_key, parsed, reference_date):
+    if "error" not in parsed:
+        get_nlu_cache().set(cache_key, parsed, ttl=_seconds_until_midnight(reference_date))
+    return parsed
+
+def parse_event_prompt(user_input, priority=PRIORITY_INTERACTIVE):
+    """
+    Parses a request into event details. Results are cached per normalized input and
+    reference date, and expire at midnight because relative dates like 'tomorrow'
+    change meaning then. Error results are never cached. priority is the gateway
+    priority of the LLM call, if one is needed; batch callers pass PRIORITY_BATCH.
+    """
+    reference_date = datetime.today()
+    cache_key = _cache_key(user_input, reference_date)
+    cached = _cached_parse(cache_key)
+    if cached is not None:
+        return cached
+    return _store_parse(cache_key, _parse_uncached(user_input, reference_date, priority), reference_date)
+
+async def aparse_event_prompt(user_input, priority=PRIORITY_INTERACTIVE):
+    """
+    Async parse_event_prompt: same cache and rules, with the LLM call made via ainvoke.
+    """
+    reference_date = datetime.today()
+    cache_key = _cache_key(user_input, reference_date)
+    cached = _cached_parse(cache_key)
+    if cached is not None:
+        return cached
+
+    parsed = _rule_parse(user_input, reference_date)
+    if parsed is None:
+        response = await allm_call(get_llm().ainvoke, _llm_prompt(user_input, reference_date),
+                                   priority=priority)
+        parsed = _parse_llm_output(response)
+    return _store_parse(cache_key, parsed, reference_date)
+
+def _rule_parse(user_input, reference_date):
+    parsed = rule_based_parse(user_input, reference_date)
+    if parsed is not None:
+        _record_path("rules")
+    return parsed
+
+def _llm_prompt(user_input, reference_date):
+    _record_path("llm")
+    today = reference_date.strftime('%Y-%m-%d')
+    return PROMPT_TEMPLATE.format(current_date=today, user_input=user_input)
+
+def _parse_uncached(user_input, reference_date, priority=PRIORITY_INTERACTIVE):
+    parsed = _rule_parse(user_input, reference_date)
+    if parsed is not None:
+        return parsed
+    response = llm_call(get_llm().invoke, _llm_prompt(user_input, reference_date), priority=priority)
+    return _parse_llm_output(response)
+
+def _parse_llm_output(response):
     output_str = response.content if hasattr(response, 'content') else str(response)
-    print("DEBUG LLM OUTPUT:\n", output_str)
-
-    json_match = re.search(r'\{.*?\}', output_str, re.DOTALL)
-    if json_match:
-        json_str = json_match.group()
-        try:
-            parsed = json.loads(json_str)
-            if 'brand_name' not in parsed:
-                parsed['brand_name'] = None
-            return parsed
-        except Exception as e:
-            return {"error": f"JSON parsing failed: {e}\nRaw JSON string: {json_str}"}
-    else:
-        return {"error": "No JSON found in model response.\nFull output: " + output_str}
+    logger.debug(f"NLU LLM output:\n{output_str}")
+
+    extractor = IncrementalJSONExtractor()
+    extractor.feed(output_str)
+    parsed = extractor.finish()
+    if parsed is not None:
+        if 'brand_name' not in parsed:
+            parsed['brand_name'] = None
+        return parsed
+    if extractor.last_error is not None:
+        e, json_str = extractor.last_error
+        return {"error": f"JSON parsing failed: {e}\nRaw JSON string: {json_str}"}
+    return {"error": "No JSON found in model response.\nFull output: " + output_str}
 
 if __name__ == "__main__":
     user_input = "plan a dinner tomorrow for 3 hours for 4 people in malad"
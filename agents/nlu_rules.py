@@ -0,0 +1,227 @@
+import re
+from datetime import datetime, timedelta
+from utils.date_utils import parse_relative_date
+
+EVENT_KEYWORDS = [
+    "birthday party", "anniversary dinner", "team lunch", "team dinner", "office party",
+    "breakfast", "brunch", "lunch", "dinner", "date", "coffee", "drinks",
+    "party", "meeting", "meetup", "get together", "celebration", "reunion",
+]
+
+BRANDS = {
+    "starbucks": ("Starbucks", "cafe"),
+    "mcdonald's": ("McDonald's", "restaurant"),
+    "mcdonalds": ("McDonald's", "restaurant"),
+    "joey's pizza": ("Joey's Pizza", "pizza restaurant"),
+    "domino's": ("Domino's", "pizza restaurant"),
+    "dominos": ("Domino's", "pizza restaurant"),
+    "pizza hut": ("Pizza Hut", "pizza restaurant"),
+    "kfc": ("KFC", "restaurant"),
+    "burger king": ("Burger King", "restaurant"),
+    "subway": ("Subway", "restaurant"),
+    "cafe coffee day": ("Cafe Coffee Day", "cafe"),
+    "chaayos": ("Chaayos", "cafe"),
+    "theobroma": ("Theobroma", "cafe"),
+    "hard rock cafe": ("Hard Rock Cafe", "bar"),
+    "taco bell": ("Taco Bell", "restaurant"),
+}
+
+QUERY_TYPES = [
+    ("pizza", "pizza restaurant"),
+    ("coffee shop", "cafe"),
+    ("cafe", "cafe"),
+    ("pub", "pub"),
+    ("bar", "bar"),
+    ("club", "club"),
+    ("restaurant", "restaurant"),
+]
+
+EVENT_QUERY_TYPES = {
+    "coffee": "cafe",
+    "drinks": "bar",
+}
+
+NUMBER_WORDS = {
+    "a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6,
+    "seven": 7, "eight": 8, "nine": 9, "ten": 10, "twelve": 12, "couple of": 2,
+}
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+_NUMBER = r"(\d+(?:\.\d+)?|" + "|".join(sorted(NUMBER_WORDS, key=len, reverse=True)) + r")"
+DURATION_RE = re.compile(r"\bfor\s+" + _NUMBER + r"\s*(?:hours?|hrs?|h)\b")
+HALF_HOUR_RE = re.compile(r"\bfor\s+(?:half an hour|30\s*min(?:ute)?s?)\b")
+HEADCOUNT_RE = re.compile(
+    r"\b(?:for|with)\s+(?:a\s+)?" + _NUMBER + r"\s+(?:people|persons|guests|friends|pax|members|colleagues|adults)\b"
+)
+# any other number left in the text may be a headcount the strict pattern missed ("for 6", "party of 8")
+STRAY_NUMBER_RE = re.compile(r"\b(?:\d+|" + "|".join(w for w in NUMBER_WORDS if w not in ("a", "an")) + r")\b")
+CLOCK_TIME_RE = re.compile(r"\b\d{1,2}(?::\d{2})?\s*(?:am|pm)\b|\b\d{1,2}:\d{2}\b")
+TIME_OF_DAY_RE = re.compile(r"(?:the\s+)?(?:morning|afternoon|evening|night|day)")
+LOCATION_CONNECTOR_RE = re.compile(r"\b(?:not|and|instead|rather|except|but|than|near|around|in)\b")
+LOCATION_RE = re.compile(
+    r"\b(?:in|near|around)\s+([a-z][a-z .'-]*?)"
+    r"(?=\s+(?:for|on|tomorrow|today|with|at|this|next|from|by)\b|[,.!?]|$)"
+)
+DATE_PATTERNS = [
+    re.compile(r"\bday after tomorrow\b"),
+    re.compile(r"\btomorrow\b"),
+    re.compile(r"\btoday\b|\btonight\b"),
+    re.compile(r"\bin\s+\d+\s+days?\b"),
+    re.compile(r"\b\d{4}-\d{2}-\d{2}\b"),
+    re.compile(r"\b\d{1,2}(?:st|nd|rd|th)?\s+(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\b"),
+    re.compile(r"\b(?:jan|feb|mar|apr|may|jun|jul|aug|sep|oct|nov|dec)[a-z]*\s+\d{1,2}(?:st|nd|rd|th)?\b"),
+]
+WEEKDAY_RE = re.compile(r"\b(?:(this|next|on|coming)\s+)?(" + "|".join(WEEKDAYS) + r")\b")
+AMBIGUOUS_RE = re.compile(r"\b(?:or|maybe|between|until|till|either|weekend|week)\b|\bfrom\b.+\bto\b|\?")
+
+def _to_number(token):
+    token = token.strip()
+    if token in NUMBER_WORDS:
+        return NUMBER_WORDS[token]
+    value = float(token)
+    return int(value) if value.is_integer() else value
+
+def _date_spans(text):
+    """
+    Character spans of the date phrases in text, with overlaps merged
+    ('day after tomorrow' is one phrase, not two).
+    """
+    spans = sorted(m.span() for pattern in DATE_PATTERNS + [WEEKDAY_RE] for m in pattern.finditer(text))
+    merged = []
+    for start, end in spans:
+        if merged and start < merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+        else:
+            merged.append((start, end))
+    return merged
+
+def _extract_date(text, reference_date):
+    match = WEEKDAY_RE.search(text)
+    if match:
+        days_ahead = (WEEKDAYS.index(match.group(2)) - reference_date.weekday()) % 7
+        if days_ahead == 0 and match.group(1) == "next":
+            days_ahead = 7
+        return (reference_date + timedelta(days=days_ahead)).strftime("%Y-%m-%d")
+
+    for pattern in DATE_PATTERNS:
+        match = pattern.search(text)
+        if not match:
+            continue
+        phrase = "today" if match.group() == "tonight" else match.group()
+        parsed = parse_relative_date(phrase, reference_date)
+        if parsed is None:
+            return None
+        parsed_date = datetime.strptime(parsed, "%Y-%m-%d")
+        if parsed_date.date() < reference_date.date():
+            # "12 july" after July means next year's, as the LLM prompt would read it
+            parsed_date = parsed_date.replace(year=parsed_date.year + 1)
+        return parsed_date.strftime("%Y-%m-%d")
+    return None
+
+def _extract_brand(text):
+    for key in sorted(BRANDS, key=len, reverse=True):
+        if re.search(r"\b" + re.escape(key) + r"(?=\W|$)", text):
+            return BRANDS[key]
+    return None, None
+
+def _extract_location(text, brand_name):
+    """
+    The single place named by an "in/near/around X" phrase, or None when there is
+    none, more than one, or the phrase hedges ("in malad not bandra").
+    """
+    locations = set()
+    for match in LOCATION_RE.finditer(text):
+        location = match.group(1).strip(" .'-")
+        if not location or (brand_name and location == brand_name.lower()):
+            continue
+        if re.fullmatch(r"\d+\s+days?", location) or TIME_OF_DAY_RE.fullmatch(location):
+            continue
+        if LOCATION_CONNECTOR_RE.search(location):
+            return None
+        locations.add(location)
+    if len(locations) != 1:
+        return None
+    return locations.pop().title()
+
+def _extract_headcount(text, date_spans):
+    """
+    Number of people from a "for/with N people" phrase. Defaults to 2 only when the
+    text has no other number that could be a headcount; otherwise returns None.
+    """
+    match = HEADCOUNT_RE.search(text)
+    number_of_people = _to_number(match.group(1)) if match else 2
+    rest = text
+    for start, end in sorted(date_spans + ([match.span()] if match else []), reverse=True):
+        rest = rest[:start] + " " + rest[end:]
+    rest = HALF_HOUR_RE.sub(" ", DURATION_RE.sub(" ", CLOCK_TIME_RE.sub(" ", rest)))
+    if STRAY_NUMBER_RE.search(rest) or number_of_people < 1:
+        return None
+    return number_of_people
+
+def rule_based_parse(user_input, reference_date=None):
+    """
+    Deterministic parser for formulaic requests such as
+    'plan a dinner tomorrow for 3 hours for 4 people in malad'.
+
+    Returns:
+        dict in the same shape as the LLM output when every field was extracted
+        with confidence, otherwise None.
+    """
+    if reference_date is None:
+        reference_date = datetime.today()
+    text = " ".join(user_input.lower().split())
+
+    if AMBIGUOUS_RE.search(text):
+        return None
+
+    event_name = next((kw for kw in EVENT_KEYWORDS if re.search(r"\b" + kw + r"\b", text)), None)
+    if event_name is None:
+        return None
+
+    if HALF_HOUR_RE.search(text):
+        duration_hours = 0.5
+    else:
+        match = DURATION_RE.search(text)
+        if not match:
+            return None
+        duration_hours = _to_number(match.group(1))
+        if duration_hours <= 0:
+            return None
+
+    date_spans = _date_spans(text)
+    if len(date_spans) != 1:
+        return None
+    start_date = _extract_date(text, reference_date)
+    if start_date is None:
+        return None
+
+    brand_name, brand_query_type = _extract_brand(text)
+    if brand_name is None and re.search(r"\bat\s+(?!\d)[a-z]", text):
+        # "at <something>" that is not a known brand; leave it to the model
+        return None
+
+    location = _extract_location(text, brand_name)
+    if location is None:
+        return None
+
+    number_of_people = _extract_headcount(text, date_spans)
+    if number_of_people is None:
+        return None
+
+    query_type = brand_query_type
+    if query_type is None:
+        query_type = next((qt for kw, qt in QUERY_TYPES if re.search(r"\b" + kw + r"\b", text)), None)
+    if query_type is None:
+        query_type = EVENT_QUERY_TYPES.get(event_name, "restaurant")
+
+    return {
+        "event_name": event_name,
+        "duration_hours": duration_hours,
+        "start_date": start_date,
+        "end_date": start_date,
+        "location": location,
+        "brand_name": brand_name,
+        "query_type": query_type,
+        "number_of_people": number_of_people,
+    }
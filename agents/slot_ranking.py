@@ -0,0 +1,101 @@
+from datetime import datetime
+import numpy as np
+from agents.event_scheduler import EVENT_WINDOWS, EPOCH, MINUTES_PER_DAY, event_type
+
+def default_preferences():
+    """
+    Hour-of-day score tables per event type: 1.0 inside the preferred start window from
+    EVENT_WINDOWS, 0.0 elsewhere. 'default' applies to events of no known type.
+    """
+    tables = {'default': np.zeros(24)}
+    for name, (start_hour, end_hour) in EVENT_WINDOWS.items():
+        table = np.zeros(24)
+        table[start_hour:min(end_hour, 24)] = 1.0
+        tables[name] = table
+    return tables
+
+class SlotIndex:
+    """
+    Slots parsed once into parallel arrays of hour-of-day and weekday (Monday=0), so
+    every ranking afterwards is a table lookup over the whole array.
+    """
+    __slots__ = ('slots', 'hours', 'weekdays')
+
+    def __init__(self, slots, hours, weekdays):
+        self.slots = slots
+        self.hours = hours
+        self.weekdays = weekdays
+
+    def __len__(self):
+        return len(self.slots)
+
+    @classmethod
+    def from_dicts(cls, slots):
+        hours = np.empty(len(slots), dtype=np.int8)
+        weekdays = np.empty(len(slots), dtype=np.int8)
+        weekday_of = {}
+        for i, slot in enumerate(slots):
+            hours[i] = int(slot['start_time'].split(':')[0])
+            day = slot['date']
+            if day not in weekday_of:
+                weekday_of[day] = datetime.strptime(day, '%Y-%m-%d').weekday()
+            weekdays[i] = weekday_of[day]
+        return cls(slots, hours, weekdays)
+
+    @classmethod
+    def from_slot_range(cls, slot_range):
+        starts, _ = slot_range.as_arrays()
+        hours = ((starts % MINUTES_PER_DAY) // 60).astype(np.int8)
+        # 1970-01-01 was a Thursday (weekday 3)
+        weekdays = ((starts // MINUTES_PER_DAY + EPOCH.weekday()) % 7).astype(np.int8)
+        return cls(slot_range, hours, weekdays)
+
+class SlotRanker:
+    """
+    Scores slots as hour_preference[type][hour] + weekday_preference[type][weekday] and
+    returns them best first. Ties keep input order, so with the default tables the top
+    slot is the first one in the preferred window, as the old first-match scan picked.
+    """
+    def __init__(self, hour_preferences=None, weekday_preferences=None):
+        self.hour_preferences = default_preferences()
+        for name, table in (hour_preferences or {}).items():
+            self.hour_preferences[name] = np.asarray(table, dtype=np.float64)
+        self.weekday_preferences = {
+            name: np.asarray(table, dtype=np.float64) for name, table in (weekday_preferences or {}).items()
+        }
+
+    def scores(self, index, event_name):
+        kind = event_type(event_name) or 'default'
+        scores = self.hour_preferences.get(kind, self.hour_preferences['default'])[index.hours]
+        weekday_table = self.weekday_preferences.get(kind)
+        if weekday_table is not None:
+            scores = scores + weekday_table[index.weekdays]
+        return scores
+
+    def rank(self, index, event_name, top_k=3):
+        """
+        Returns up to top_k (slot, score) pairs, best first.
+        """
+        if len(index) == 0:
+            return []
+        scores = self.scores(index, event_name)
+        if top_k and top_k < len(scores):
+            # only the best top_k need a full sort; stable order among ties is kept below
+            cutoff = np.partition(-scores, top_k - 1)[top_k - 1]
+            candidates = np.flatnonzero(-scores <= cutoff)
+        else:
+            candidates = np.arange(len(scores))
+        order = candidates[np.argsort(-scores[candidates], kind='stable')][:top_k or None]
+        return [(index.slots[int(i)], float(scores[i])) for i in order]
+
+default_ranker = SlotRanker()
+
+def rank_slots(feasible_slots, event_name, top_k=3, ranker=None):
+    """
+    Ranks a list of slot dicts or a SlotRange for an event. Returns a list of slot dicts, best first.
+    """
+    if hasattr(feasible_slots, 'as_arrays'):
+        index = SlotIndex.from_slot_range(feasible_slots)
+    else:
+        index = SlotIndex.from_dicts(feasible_slots)
+    return [slot for slot, _ in (ranker or default_ranker).rank(index, event_name, top_k)]
@@ -0,0 +1,161 @@
+import json
+import math
+import os
+import threading
+from collections import defaultdict
+from utils.cache import TTLCache, normalize_key, MISS
+from utils.geo import within_radius
+from utils.logger import logger
+
+GRID_CELL_DEGREES = 0.05
+KM_PER_DEGREE_LAT = 111.32
+COVERAGE_TTL_SECONDS = int(os.getenv("VENUE_COVERAGE_TTL_SECONDS", str(6 * 3600)))
+
+def _cell(lat, lon):
+    return (math.floor(lat / GRID_CELL_DEGREES), math.floor(lon / GRID_CELL_DEGREES))
+
+def _coverage_key(region, query, radius_km):
+    return f"{normalize_key(region)}|{normalize_key(query or '')}|{float(radius_km):g}"
+
+def _venue_id(venue):
+    return f"{normalize_key(venue.get('name', ''))}@{float(venue['latitude']):.5f},{float(venue['longitude']):.5f}"
+
+class VenueStore:
+    """
+    Local venue snapshot with a lat/lon grid index for radius queries and
+    secondary indexes on normalized name tokens and category/type.
+
+    Holding some venues for an area does not mean holding all of them, so callers
+    record each (region, query, radius) search they completed remotely with
+    mark_covered() and only answer from the store while is_covered() holds.
+    """
+    def __init__(self, coverage_ttl=COVERAGE_TTL_SECONDS):
+        self._venues = {}
+        self._grid = defaultdict(set)
+        self._name_tokens = defaultdict(set)
+        self._categories = defaultdict(set)
+        self._coverage = TTLCache(maxsize=4096, ttl=coverage_ttl)
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._venues)
+
+    def add_venue(self, venue):
+        try:
+            lat = float(venue["latitude"])
+            lon = float(venue["longitude"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        venue_id = _venue_id(venue)
+        with self._lock:
+            if venue_id in self._venues:
+                self._venues[venue_id] = dict(venue)
+                return venue_id
+            self._venues[venue_id] = dict(venue)
+            self._grid[_cell(lat, lon)].add(venue_id)
+            for token in normalize_key(venue.get("name", "")).split():
+                self._name_tokens[token].add(venue_id)
+            for field in ("category", "type"):
+                label = normalize_key(venue.get(field) or "")
+                if label:
+                    self._categories[label].add(venue_id)
+        return venue_id
+
+    def add_venues(self, venues):
+        return sum(1 for venue in venues if self.add_venue(venue) is not None)
+
+    def _ids_in_box(self, lat, lon, radius_km):
+        dlat = radius_km / KM_PER_DEGREE_LAT
+        dlon = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(lat)), 1e-6))
+        lat_lo, lon_lo = _cell(lat - dlat, lon - dlon)
+        lat_hi, lon_hi = _cell(lat + dlat, lon + dlon)
+        ids = set()
+        for i in range(lat_lo, lat_hi + 1):
+            for j in range(lon_lo, lon_hi + 1):
+                ids |= self._grid.get((i, j), set())
+        return ids
+
+    def _ids_matching(self, query):
+        """
+        Venues whose category/type equals the query, or whose name contains it
+        (the same substring rule nearby_search applies to brand names).
+        """
+        key = normalize_key(query)
+        if not key:
+            return set(self._venues)
+        ids = set(self._categories.get(key, set()))
+        tokens = key.split()
+        candidates = set.intersection(*(self._name_tokens.get(t, set()) for t in tokens)) if tokens else set()
+        ids |= {vid for vid in candidates if key in normalize_key(self._venues[vid].get("name", ""))}
+        return ids
+
+    def mark_covered(self, region, query, radius_km):
+        self._coverage.set(_coverage_key(region, query, radius_km), True)
+
+    def is_covered(self, region, query, radius_km):
+        """
+        True while a remote search for this region, query and radius finished within the coverage TTL.
+        """
+        return self._coverage.get(_coverage_key(region, query, radius_km)) is not MISS
+
+    def query(self, lat, lon, radius_km=5.0, query=None, limit=20):
+        """
+        Returns venues within radius_km of (lat, lon) matching query, nearest first.
+        """
+        lat, lon = float(lat), float(lon)
+        with self._lock:
+            ids = self._ids_in_box(lat, lon, radius_km)
+            if query:
+                ids &= self._ids_matching(query)
+            if not ids:
+                return []
+            ids = sorted(ids)
+            venues = [self._venues[vid] for vid in ids]
+        _, order, _ = within_radius(
+            lat, lon,
+            [float(v["latitude"]) for v in venues],
+            [float(v["longitude"]) for v in venues],
+            radius_km,
+        )
+        return [dict(venues[i]) for i in order[:limit]]
+
+    def load(self, path):
+        """
+        Bulk import from a JSON array or a JSONL file of venue dicts.
+        """
+        with open(path, encoding="utf-8") as f:
+            text = f.read()
+        stripped = text.lstrip()
+        if stripped.startswith("["):
+            venues = json.loads(stripped)
+        else:
+            venues = [json.loads(line) for line in text.splitlines() if line.strip()]
+        added = self.add_venues(venues)
+        logger.info(f"Loaded {added} venues from '{path}'")
+        return added
+
+    def save(self, path):
+        with self._lock:
+            venues = list(self._venues.values())
+        with open(path, "w", encoding="utf-8") as f:
+            for venue in venues:
+                f.write(json.dumps(venue) + "\n")
+        return len(venues)
+
+_venue_store = None
+_venue_store_lock = threading.Lock()
+
+def get_venue_store():
+    """
+    Returns the process-wide venue store, bulk-loaded from VENUE_SNAPSHOT_PATH if set.
+    """
+    global _venue_store
+    if _venue_store is None:
+        with _venue_store_lock:
+            if _venue_store is None:
+                store = VenueStore()
+                path = os.getenv("VENUE_SNAPSHOT_PATH")
+                if path and os.path.exists(path):
+                    store.load(path)
+                _venue_store = store
+    return _venue_store
@@ -0,0 +1,225 @@
+"""
+Headless batch planner: runs every request in a JSONL file through the tool pipeline.
+
+    python batch_runner.py requests.jsonl results.jsonl --workers 8
+    python batch_runner.py requests.jsonl results.jsonl --resume
+
+Each input line is {"id": ..., "user_input": "..."} (a bare JSON string also works;
+the id then defaults to the line number). Each output line is one finished request,
+written as soon as it completes: {"id", "status": "ok", "plan", "timings_ms"} or
+{"id", "status": "error", "stage", "error", "timings_ms"}. A failure in one request is
+recorded and the run carries on. With --resume, ids already written with status "ok"
+are skipped and failed ones are retried.
+"""
+import argparse
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+from agents.nlu_agent import parse_event_prompt
+from tools.agent_tools import (
+    location_finder_tool,
+    slot_generator_tool,
+    slot_selection_tool,
+    batch_budget_estimator_tool,
+)
+from utils.llm_gateway import PRIORITY_BATCH
+from utils.tracing import span
+
+STAGES = ["nlu", "location", "slots", "selection", "budget"]
+
+class StageError(Exception):
+    def __init__(self, stage, message):
+        super().__init__(message)
+        self.stage = stage
+
+def read_requests(path):
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                item = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield {"id": str(line_no), "user_input": None, "error": f"invalid JSON: {e}"}
+                continue
+            if isinstance(item, str):
+                item = {"user_input": item}
+            yield {"id": str(item.get("id", line_no)), "user_input": item.get("user_input") or item.get("request")}
+
+def completed_ids(path):
+    """
+    Ids already written with status "ok" to an existing output file.
+    """
+    done = set()
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # a line cut short by an interrupted run
+                    continue
+                if record.get("status") == "ok":
+                    done.add(str(record["id"]))
+    except FileNotFoundError:
+        pass
+    return done
+
+def plan_request(user_input, timings):
+    """
+    Runs one request through nlu -> location -> slots -> selection -> budget,
+    recording each stage's wall time in timings (milliseconds).
+    """
+    def stage(name, fn):
+        started = time.perf_counter()
+        try:
+            return fn()
+        except StageError:
+            raise
+        except Exception as e:
+            raise StageError(name, f"{type(e).__name__}: {e}") from e
+        finally:
+            timings[name] = round((time.perf_counter() - started) * 1000, 2)
+
+    def nlu():
+        # same parse as nlu_tool, but queued behind interactive LLM calls
+        details = parse_event_prompt(user_input, priority=PRIORITY_BATCH)
+        if "error" in details:
+            raise StageError("nlu", details["error"])
+        return details
+
+    details = stage("nlu", nlu)
+    venues = stage("location", lambda: location_finder_tool.invoke({
+        "location": details["location"],
+        "query_type": details.get("query_type") or "restaurant",
+        "brand_name": details.get("brand_name") or ""
+    })["nearby_places"])
+    slots = stage("slots", lambda: slot_generator_tool.invoke({
+        "start_date": details["start_date"],
+        "end_date": details.get("end_date") or details["start_date"],
+        "duration_hours": details.get("duration_hours") or 1
+    })["feasible_slots"])
+    selection = stage("selection", lambda: slot_selection_tool.invoke({
+        "event_name": details["event_name"],
+        "feasible_slots": slots
+    }))
+    budgets = stage("budget", lambda: batch_budget_estimator_tool.invoke({
+        "number_of_people": details.get("number_of_people") or 1,
+        "venues": venues
+    })["budget_estimates"])
+
+    return {
+        "event": details,
+        "venues": venues,
+        "selected_slot": selection["selected_slot"],
+        "ranked_slots": selection["ranked_slots"],
+        "feasible_slot_count": len(slots),
+        "budget_estimates": budgets,
+    }
+
+def run_one(request):
+    timings = {}
+    record = {"id": request["id"], "user_input": request["user_input"]}
+    started = time.perf_counter()
+    with span("batch.request", request_id=request["id"]) as s:
+        try:
+            if request.get("error") or not request["user_input"]:
+                raise StageError("input", request.get("error") or "missing user_input")
+            record["plan"] = plan_request(request["user_input"], timings)
+            record["status"] = "ok"
+        except StageError as e:
+            record.update(status="error", stage=e.stage, error=str(e))
+        except Exception as e:
+            record.update(status="error", stage="unknown", error=f"{type(e).__name__}: {e}")
+        s.set("status", record["status"])
+    timings["total"] = round((time.perf_counter() - started) * 1000, 2)
+    record["timings_ms"] = timings
+    return record
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * (len(sorted_values) - 1))))
+    return sorted_values[index]
+
+def summarize(records, elapsed):
+    ok = sum(1 for r in records if r["status"] == "ok")
+    stages = {}
+    for name in STAGES + ["total"]:
+        values = sorted(r["timings_ms"][name] for r in records if name in r["timings_ms"])
+        if values:
+            stages[name] = {f"p{q}": percentile(values, q) for q in (50, 90, 99)}
+            stages[name]["count"] = len(values)
+    errors = {}
+    for r in records:
+        if r["status"] == "error":
+            errors[r["stage"]] = errors.get(r["stage"], 0) + 1
+    return {
+        "requests": len(records),
+        "ok": ok,
+        "failed": len(records) - ok,
+        "errors_by_stage": errors,
+        "elapsed_s": round(elapsed, 2),
+        "throughput_per_s": round(len(records) / elapsed, 3) if elapsed else None,
+        "stages_ms": stages,
+    }
+
+def run_batch(input_path, output_path, workers=4, resume=False, progress=True):
+    """
+    Plans every request in input_path with a pool of `workers` threads and appends
+    results to output_path as they finish. Returns the summary dict.
+    """
+    done = completed_ids(output_path) if resume else set()
+    skipped = 0
+    records = []
+    lock = threading.Lock()
+    started = time.perf_counter()
+
+    with open(output_path, "a" if resume else "w", encoding="utf-8") as out, \
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch") as pool:
+
+        def write(record):
+            with lock:
+                out.write(json.dumps(record, default=str) + "\n")
+                out.flush()
+                records.append(record)
+            if progress:
+                status = record["status"] if record["status"] == "ok" else f"error at {record['stage']}"
+                print(f"[{len(records)}] {record['id']}: {status} ({record['timings_ms']['total']} ms)",
+                      file=sys.stderr)
+
+        # keep the number of queued requests bounded so huge input files stream through
+        in_flight = set()
+        for request in read_requests(input_path):
+            if request["id"] in done:
+                skipped += 1
+                continue
+            if len(in_flight) >= workers * 2:
+                finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    write(future.result())
+            in_flight.add(pool.submit(run_one, request))
+        for future in as_completed(in_flight):
+            write(future.result())
+
+    summary = summarize(records, time.perf_counter() - started)
+    summary["skipped"] = skipped
+    return summary
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("input", help="JSONL file of requests")
+    parser.add_argument("output", help="JSONL file to write results to")
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--resume", action="store_true", help="skip ids already completed in output")
+    parser.add_argument("--quiet", action="store_true", help="do not print per-request progress")
+    args = parser.parse_args()
+
+    summary = run_batch(args.input, args.output, args.workers, args.resume, progress=not args.quiet)
+    print(json.dumps(summary, indent=2))
+
+if __name__ == "__main__":
+    main()
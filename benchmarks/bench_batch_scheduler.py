@@ -0,0 +1,59 @@
+"""
+Batch scheduler benchmark at 10 / 100 / 1000 events.
+
+    python -m benchmarks.bench_batch_scheduler
+    python -m benchmarks.bench_batch_scheduler --sizes 10 100 1000 5000 --venues 8
+"""
+import argparse
+import json
+import random
+import time
+from datetime import datetime, timedelta
+from agents.batch_scheduler import schedule_batch
+
+EVENT_TYPES = ["team lunch", "client dinner", "date night", "offsite workshop", "coffee meetup"]
+
+def make_events(n, days, seed):
+    rng = random.Random(seed)
+    start = datetime(2025, 7, 1)
+    events = []
+    for i in range(n):
+        first = start + timedelta(days=rng.randrange(days))
+        events.append({
+            "event_name": f"{rng.choice(EVENT_TYPES)} {i}",
+            "duration_hours": rng.choice([1, 1.5, 2, 3]),
+            "start_date": first.strftime("%Y-%m-%d"),
+            "end_date": (first + timedelta(days=rng.randrange(1, 8))).strftime("%Y-%m-%d"),
+        })
+    return events
+
+def run(size, venues, days, seed):
+    events = make_events(size, days, seed)
+    venue_names = [f"Venue {v}" for v in range(venues)]
+    end_date = (datetime(2025, 7, 1) + timedelta(days=days + 8)).strftime("%Y-%m-%d")
+    started = time.perf_counter()
+    result = schedule_batch(events, venue_names, "2025-07-01", end_date, step_minutes=30)
+    elapsed = time.perf_counter() - started
+    assigned = result["assignments"]
+    return {
+        "events": size,
+        "venues": venues,
+        "seconds": round(elapsed, 4),
+        "ms_per_event": round(elapsed * 1000 / size, 3),
+        "assigned": len(assigned),
+        "unassigned": len(result["unassigned"]),
+        "in_preferred_window": sum(1 for a in assigned if a["preferred_window"]),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--venues", type=int, default=5)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    results = [run(size, args.venues, args.days, args.seed) for size in args.sizes]
+    print(json.dumps({"benchmark": "batch_scheduler", "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Microbenchmark: incremental JSON extractor vs the regex extractors it replaced.
+
+    python -m benchmarks.bench_json_extract
+    python -m benchmarks.bench_json_extract --repeat 200 --prose-kb 1 16 64
+"""
+import argparse
+import json
+import re
+import timeit
+from utils.json_stream import IncrementalJSONExtractor, extract_json
+
+TOOL_CALL = {
+    "tool_calls": [
+        {"id": "nlu", "tool": "nlu_tool", "args": {"user_input": "Plan dinner {tomorrow} for \"4\" people in Malad"}},
+        {"id": "slots", "tool": "slot_generator_tool", "args": {"start_date": "$nlu.start_date", "duration_hours": 3}},
+    ]
+}
+
+def recursive_regex_extract(text, _pattern=[]):
+    # what manual_agentic_planner.extract_json used: the `regex` package's (?R) recursion
+    import regex
+    if not _pattern:
+        _pattern.append(regex.compile(r"\{(?:[^{}]|(?R))*\}", regex.DOTALL))
+    match = _pattern[0].search(text)
+    if match:
+        try:
+            return json.loads(match.group())
+        except json.JSONDecodeError:
+            return None
+    return None
+
+def non_greedy_regex_extract(text):
+    # what nlu_agent.parse_event_prompt used; breaks on nested objects
+    match = re.search(r"\{.*?\}", text, re.DOTALL)
+    if match:
+        try:
+            return json.loads(match.group())
+        except json.JSONDecodeError:
+            return None
+    return None
+
+def make_completion(prose_kb):
+    prose = ("Sure, here is what I will do next for your event. " * 40)[:1024] * prose_kb
+    return f"{prose}\n```json\n{json.dumps(TOOL_CALL)}\n```\n{prose}"
+
+def time_call(fn, text, repeat):
+    return min(timeit.repeat(lambda: fn(text), number=1, repeat=repeat)) * 1e6
+
+def time_to_dispatch(text, chunk_size=16):
+    """
+    Characters of the completion that must have streamed in before the call can be dispatched.
+    """
+    extractor = IncrementalJSONExtractor()
+    for i in range(0, len(text), chunk_size):
+        if extractor.feed(text[i:i + chunk_size]) is not None:
+            return min(i + chunk_size, len(text))
+    return len(text)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--prose-kb", type=int, nargs="+", default=[1, 8, 32])
+    args = parser.parse_args()
+
+    results = []
+    for kb in args.prose_kb:
+        text = make_completion(kb)
+        row = {
+            "completion_chars": len(text),
+            "incremental_us": round(time_call(extract_json, text, args.repeat), 1),
+            "non_greedy_regex_us": round(time_call(non_greedy_regex_extract, text, args.repeat), 1),
+            "non_greedy_regex_correct": non_greedy_regex_extract(text) == TOOL_CALL,
+            "incremental_correct": extract_json(text) == TOOL_CALL,
+            "dispatch_after_chars": time_to_dispatch(text),
+        }
+        try:
+            row["recursive_regex_us"] = round(time_call(recursive_regex_extract, text, args.repeat), 1)
+            row["recursive_regex_correct"] = recursive_regex_extract(text) == TOOL_CALL
+        except ImportError:
+            row["recursive_regex_us"] = None
+        results.append(row)
+    print(json.dumps({"benchmark": "json_extract", "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+PDF export benchmark: per-plan render time, cache hits and batch export.
+
+    python -m benchmarks.bench_pdf_export
+    python -m benchmarks.bench_pdf_export --plans 10 100 500 --repeat 5
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+from fpdf import FPDF
+from utils import pdf_export
+
+def make_plan(i):
+    plan = f"""
+Event: Team Dinner {i}
+Date: 2025-07-{i % 28 + 1:02d}
+Time: 19:00 to 22:00
+Guests: {4 + i % 20}
+Venue Options:
+"""
+    for v in range(5):
+        plan += f"- Venue {i}-{v} (Link Road, Malad West, Mumbai)\n"
+    return plan
+
+def render_to_file(plan_text, filename):
+    # what main.create_pdf used to do: write to disk, then read the file back
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_font("Arial", size=12)
+    for line in plan_text.split("\n"):
+        pdf.cell(200, 10, txt=line, ln=1)
+    pdf.output(filename)
+    with open(filename, "rb") as f:
+        return f.read()
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+def run(n, repeat):
+    plans = [make_plan(i) for i in range(n)]
+    with tempfile.TemporaryDirectory() as tmp:
+        filename = os.path.join(tmp, "event_plan.pdf")
+        file_s = best_of(lambda: [render_to_file(p, filename) for p in plans], repeat)
+
+    def cold():
+        pdf_export._pdf_cache.clear()
+        for p in plans:
+            pdf_export.render_plan_pdf(p)
+    memory_s = best_of(cold, repeat)
+    cached_s = best_of(lambda: [pdf_export.render_plan_pdf(p) for p in plans], repeat)
+    combined_s = best_of(lambda: pdf_export.render_plans_pdf(plans), repeat)
+    pdf_export._pdf_cache.clear()
+    zip_s = best_of(lambda: pdf_export.render_plans_zip(plans), 1)
+    return {
+        "plans": n,
+        "file_per_plan_ms": round(file_s / n * 1000, 3),
+        "memory_per_plan_ms": round(memory_s / n * 1000, 3),
+        "cached_per_plan_ms": round(cached_s / n * 1000, 4),
+        "combined_document_ms": round(combined_s * 1000, 2),
+        "zip_cold_ms": round(zip_s * 1000, 2),
+        "combined_document_kb": round(len(pdf_export.render_plans_pdf(plans)) / 1024, 1),
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--plans", type=int, nargs="+", default=[10, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+    results = [run(n, args.repeat) for n in args.plans]
+    print(json.dumps({"benchmark": "pdf_export", "results": results}, indent=2))
+
+if __name__ == "__main__":
+    main()
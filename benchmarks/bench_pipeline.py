@@ -0,0 +1,240 @@
+"""
+End-to-end pipeline benchmark against local stand-in LocationIQ and Groq servers.
+
+    python -m benchmarks.bench_pipeline
+    python -m benchmarks.bench_pipeline --latency-ms 80 --rate-limit-every 20 --output results.json
+
+Nothing leaves the machine: both APIs are served from benchmarks/fixtures by
+benchmarks.stub_servers, so runs are reproducible and comparable. Results are
+printed (and optionally written) as JSON with per-benchmark latency percentiles.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import time
+from datetime import date, timedelta
+from benchmarks.stub_servers import Faults, load_fixture, locationiq_server, groq_server
+
+def summarize_ms(samples):
+    ordered = sorted(samples)
+
+    def pct(q):
+        return round(ordered[min(len(ordered) - 1, round(q / 100 * (len(ordered) - 1)))], 3)
+
+    return {
+        "count": len(ordered),
+        "mean_ms": round(statistics.mean(ordered), 3),
+        "p50_ms": pct(50),
+        "p90_ms": pct(90),
+        "p99_ms": pct(99),
+        "min_ms": round(ordered[0], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+def timed(fn, *args, **kwargs):
+    started = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return (time.perf_counter() - started) * 1000, result
+
+def configure_environment(locationiq_url, groq_url):
+    # must run before the app modules are imported; they read these at import time
+    os.environ.update({
+        "LOCATIONIQ_BASE_URL": f"{locationiq_url}/v1",
+        "LOCATIONIQ_API_KEY": "stub",
+        "GROQ_API_BASE": groq_url,
+        "GROQ_API_KEY": "stub",
+        "GEOCODE_CACHE_PATH": "",
+        "GAZETTEER_LEARNED_PATH": "",
+        "NLU_CACHE_BACKEND": "memory",
+        "VENUE_STORE_ENABLED": "false",
+        "VENUE_SNAPSHOT_PATH": "",
+        "BOOKINGS_PATH": "",
+    })
+    # the stubs are not rate limited unless faults are injected, so do not throttle client side
+    os.environ.setdefault("GROQ_RPM", "100000")
+    os.environ.setdefault("GROQ_TPM", "100000000")
+
+def bench_find_places(iterations, requests):
+    from agents import location_finder
+    cases = [(r["brand_name"], r["query_type"], r["location"]) for r in requests]
+    cold, warm, gazetteer, store = [], [], [], []
+    use_gazetteer = location_finder.USE_GAZETTEER
+    try:
+        for _ in range(iterations):
+            for brand, query_type, region in cases:
+                location_finder.USE_GAZETTEER = False
+                location_finder.get_geocode_cache().clear()
+                cold.append(timed(location_finder.find_places, brand, query_type, region, use_store=False)[0])
+                warm.append(timed(location_finder.find_places, brand, query_type, region, use_store=False)[0])
+                location_finder.USE_GAZETTEER = True
+                location_finder.get_geocode_cache().clear()
+                gazetteer.append(timed(location_finder.find_places, brand, query_type, region, use_store=False)[0])
+                location_finder.find_places(brand, query_type, region, use_store=True)
+                store.append(timed(location_finder.find_places, brand, query_type, region, use_store=True)[0])
+    finally:
+        location_finder.USE_GAZETTEER = use_gazetteer
+    return {
+        "find_places_cold": summarize_ms(cold),
+        "find_places_geocode_cached": summarize_ms(warm),
+        "find_places_gazetteer": summarize_ms(gazetteer),
+        "find_places_venue_store": summarize_ms(store),
+    }
+
+def bench_gazetteer(iterations):
+    # local resolution cost per match kind; misses pay the full fuzzy scan
+    from agents.gazetteer import get_gazetteer
+    gazetteer = get_gazetteer()
+    queries = {
+        "exact": ["malad", "Andheri West", "bandra, mumbai", "powai", "lower parel, mumbai, maharashtra"],
+        "prefix": ["lower pa", "bandra kurla", "malabar h", "andheri e"],
+        "fuzzy": ["malaad", "andheri wset", "powaii", "bandr west"],
+        "miss": ["pune", "fort kochi", "malad west station", "delhi", "andheri esat"],
+    }
+    return {f"gazetteer_{kind}": summarize_ms([timed(gazetteer.match, q)[0]
+                                               for _ in range(iterations * 100) for q in texts])
+            for kind, texts in queries.items()}
+
+def bench_parse_event_prompt(iterations, inputs):
+    from agents import nlu_agent
+    llm, cached = [], []
+    for _ in range(iterations):
+        for text in inputs:
+            nlu_agent.get_nlu_cache().clear()
+            llm.append(timed(nlu_agent.parse_event_prompt, text)[0])
+            cached.append(timed(nlu_agent.parse_event_prompt, text)[0])
+    return {
+        "parse_event_prompt_uncached": summarize_ms(llm),
+        "parse_event_prompt_cached": summarize_ms(cached),
+    }
+
+def bench_generate_feasible_slots(iterations):
+    from agents.event_scheduler import generate_feasible_slots
+    start = date.today() + timedelta(days=1)
+    results = {}
+    for days in (1, 7, 30):
+        end = (start + timedelta(days=days - 1)).isoformat()
+        samples = [timed(generate_feasible_slots, start.isoformat(), end, 2)[0] for _ in range(iterations * 10)]
+        results[f"generate_feasible_slots_{days}d"] = summarize_ms(samples)
+    return results
+
+def bench_tools(iterations, requests):
+    # tool-layer cost with warm caches: argument validation plus the underlying call
+    from tools.agent_tools import (
+        nlu_tool, location_finder_tool, slot_generator_tool, slot_selection_tool, batch_budget_estimator_tool,
+    )
+    samples = {name: [] for name in ("nlu_tool", "location_finder_tool", "slot_generator_tool",
+                                     "slot_selection_tool", "batch_budget_estimator_tool")}
+    for _ in range(iterations):
+        for request in requests:
+            ms, details = timed(nlu_tool.invoke, {"user_input": request["user_input"]})
+            samples["nlu_tool"].append(ms)
+            ms, venues = timed(location_finder_tool.invoke, {
+                "location": details["location"], "query_type": details["query_type"],
+                "brand_name": details.get("brand_name") or ""})
+            samples["location_finder_tool"].append(ms)
+            ms, slots = timed(slot_generator_tool.invoke, {
+                "start_date": details["start_date"], "end_date": details["end_date"],
+                "duration_hours": details["duration_hours"]})
+            samples["slot_generator_tool"].append(ms)
+            ms, _ = timed(slot_selection_tool.invoke, {
+                "event_name": details["event_name"], "feasible_slots": slots["feasible_slots"]})
+            samples["slot_selection_tool"].append(ms)
+            ms, _ = timed(batch_budget_estimator_tool.invoke, {
+                "number_of_people": details["number_of_people"], "venues": venues["nearby_places"]})
+            samples["batch_budget_estimator_tool"].append(ms)
+    return {f"tool_{name}": summarize_ms(values) for name, values in samples.items()}
+
+def bench_full_plan(iterations, inputs):
+    from agents import location_finder, nlu_agent
+    from batch_runner import plan_request
+    samples, failures = [], 0
+    for _ in range(iterations):
+        for text in inputs:
+            location_finder.get_geocode_cache().clear()
+            nlu_agent.get_nlu_cache().clear()
+            started = time.perf_counter()
+            try:
+                plan_request(text, {})
+            except Exception:
+                failures += 1
+            samples.append((time.perf_counter() - started) * 1000)
+    result = summarize_ms(samples)
+    result["failures"] = failures
+    return {"full_plan_cold": result}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=20, help="injected server latency per request")
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--rate-limit-every", type=int, default=0, help="answer every Nth request with 429")
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0, help="answer this fraction with 429")
+    parser.add_argument("--retry-after", type=float, default=0, help="retry-after seconds sent with 429s")
+    parser.add_argument("--retry-base-delay", type=float, default=None, help="override the LLM gateway backoff base")
+    parser.add_argument("--only", nargs="+", choices=["find_places", "gazetteer", "nlu", "slots", "tools", "plan"])
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+
+    def faults(seed):
+        return Faults(args.latency_ms, args.jitter_ms, args.rate_limit_every, args.rate_limit_ratio,
+                      args.retry_after, seed)
+
+    fixture_requests = [json.loads(line) for line in open(
+        os.path.join(os.path.dirname(__file__), "fixtures", "requests.jsonl"), encoding="utf-8")]
+    inputs = [r["user_input"] for r in fixture_requests]
+    def fenced_json(content):
+        content = content.strip("`")
+        return json.loads(content[len("json"):] if content.startswith("json") else content)
+
+    expected = [fenced_json(c["content"]) for c in load_fixture("groq.json")["completions"]]
+
+    with locationiq_server(faults(1)) as liq, groq_server(faults(2)) as groq:
+        configure_environment(liq.url, groq.url)
+        if args.retry_base_delay is not None:
+            from utils.llm_gateway import get_gateway
+            get_gateway().base_delay = args.retry_base_delay
+
+        selected = set(args.only or ["find_places", "gazetteer", "nlu", "slots", "tools", "plan"])
+        results = {}
+        started = time.perf_counter()
+        if "find_places" in selected:
+            results.update(bench_find_places(args.iterations, expected))
+        if "gazetteer" in selected:
+            results.update(bench_gazetteer(args.iterations))
+        if "nlu" in selected:
+            results.update(bench_parse_event_prompt(args.iterations, inputs))
+        if "slots" in selected:
+            results.update(bench_generate_feasible_slots(args.iterations))
+        if "tools" in selected:
+            results.update(bench_tools(args.iterations, fixture_requests))
+        if "plan" in selected:
+            results.update(bench_full_plan(args.iterations, inputs))
+        elapsed = time.perf_counter() - started
+
+        from agents.nlu_agent import get_nlu_stats
+        from agents.location_finder import geocode_cache_stats
+        from utils.llm_gateway import get_gateway
+        report = {
+            "benchmark": "pipeline",
+            "config": {k: v for k, v in vars(args).items() if k != "output"},
+            "environment": {"python": platform.python_version(), "platform": platform.platform()},
+            "elapsed_s": round(elapsed, 3),
+            "results": results,
+            "servers": {"locationiq": liq.faults.as_dict(), "groq": groq.faults.as_dict()},
+            "gateway": dict(get_gateway().stats, queued_seconds=round(get_gateway().stats["queued_seconds"], 3)),
+            "nlu_paths": {k: v for k, v in get_nlu_stats().items() if k != "cache_stats"},
+            "geocode_cache": geocode_cache_stats(),
+        }
+
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Import-time regression guard for the tool layer.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter, reports the
+cumulative import cost and the slowest top-level imports, and exits non-zero if a
+deferred heavy dependency got imported eagerly again or the budget is exceeded.
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --module main --max-ms 1500
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules that must only load on first use, never at import of the tool layer.
+DEFERRED_MODULES = ["langchain_groq", "groq", "dateparser", "geopy", "langgraph"]
+
+def measure(module):
+    env = dict(os.environ)
+    env.pop("GROQ_API_KEY", None)  # import must not depend on credentials
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT, env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{proc.stderr[-2000:]}")
+
+    imports = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        name = name.rstrip()
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        imports[name.strip()] = (int(self_us), int(cumulative_us), depth)
+    return imports
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", default="tools.agent_tools")
+    parser.add_argument("--max-ms", type=float, default=float(os.getenv("IMPORT_BUDGET_MS", "1000")))
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--json", action="store_true", help="emit a JSON report")
+    args = parser.parse_args()
+
+    imports = measure(args.module)
+    total_ms = imports[args.module][1] / 1000
+    top_level = sorted(
+        ((name, cumulative) for name, (_, cumulative, depth) in imports.items() if depth == 1 and name != args.module),
+        key=lambda item: item[1], reverse=True,
+    )[:args.top]
+    eager = [name for name in DEFERRED_MODULES if name in imports]
+
+    report = {
+        "module": args.module,
+        "total_ms": round(total_ms, 1),
+        "budget_ms": args.max_ms,
+        "slowest": [{"module": name, "cumulative_ms": round(us / 1000, 1)} for name, us in top_level],
+        "eager_deferred_modules": eager,
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"import {args.module}: {report['total_ms']} ms (budget {args.max_ms} ms)")
+        for item in report["slowest"]:
+            print(f"  {item['cumulative_ms']:>8} ms  {item['module']}")
+        if eager:
+            print(f"eagerly imported: {', '.join(eager)}")
+
+    failed = bool(eager) or total_ms > args.max_ms
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Load test: concurrent planning sessions through the async tools (one event loop)
+versus the sync tools (one thread per session), against the local stub servers.
+
+    python -m benchmarks.load_async_tools
+    python -m benchmarks.load_async_tools --concurrency 1 8 32 128 --latency-ms 100
+
+Each session runs nlu -> location -> slots -> selection -> budget with caches cleared
+between rounds, so every session makes real HTTP calls to the stubs.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from benchmarks.stub_servers import Faults, locationiq_server, groq_server
+from benchmarks.bench_pipeline import configure_environment, summarize_ms
+
+def load_inputs():
+    path = os.path.join(os.path.dirname(__file__), "fixtures", "requests.jsonl")
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["user_input"] for line in f if line.strip()]
+
+def clear_caches():
+    from agents import location_finder, nlu_agent
+    location_finder.get_geocode_cache().clear()
+    nlu_agent.get_nlu_cache().clear()
+
+def plan_sync(user_input):
+    from tools.agent_tools import (
+        nlu_tool, location_finder_tool, slot_generator_tool, slot_selection_tool, batch_budget_estimator_tool,
+    )
+    details = nlu_tool.invoke({"user_input": user_input})
+    venues = location_finder_tool.invoke({"location": details["location"], "query_type": details["query_type"],
+                                          "brand_name": details.get("brand_name") or ""})["nearby_places"]
+    slots = slot_generator_tool.invoke({"start_date": details["start_date"], "end_date": details["end_date"],
+                                        "duration_hours": details["duration_hours"]})["feasible_slots"]
+    slot_selection_tool.invoke({"event_name": details["event_name"], "feasible_slots": slots})
+    batch_budget_estimator_tool.invoke({"number_of_people": details["number_of_people"], "venues": venues})
+
+async def plan_async(user_input):
+    from tools.agent_tools import (
+        nlu_tool, location_finder_tool, slot_generator_tool, slot_selection_tool, batch_budget_estimator_tool,
+    )
+    details = await nlu_tool.ainvoke({"user_input": user_input})
+    venues = (await location_finder_tool.ainvoke({"location": details["location"], "query_type": details["query_type"],
+                                                  "brand_name": details.get("brand_name") or ""}))["nearby_places"]
+    slots = (await slot_generator_tool.ainvoke({"start_date": details["start_date"], "end_date": details["end_date"],
+                                                "duration_hours": details["duration_hours"]}))["feasible_slots"]
+    await slot_selection_tool.ainvoke({"event_name": details["event_name"], "feasible_slots": slots})
+    await batch_budget_estimator_tool.ainvoke({"number_of_people": details["number_of_people"], "venues": venues})
+
+class ThreadSampler:
+    """
+    Samples the peak number of client-side threads while active; the stub servers'
+    per-connection threads run in this process too and are not counted.
+    """
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = 0
+        self._stop = threading.Event()
+
+    def _count(self):
+        return sum(1 for t in threading.enumerate() if "process_request_thread" not in t.name)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, self._count())
+            self._stop.wait(self.interval)
+
+    def __enter__(self):
+        self._baseline = self._count()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+        # the sampler itself is one of the counted threads
+        self.peak = max(0, self.peak - self._baseline - 1)
+
+def session_inputs(inputs, n):
+    # distinct text per session so the NLU cache cannot serve one session from another
+    return [f"{inputs[i % len(inputs)]} (session {i})" for i in range(n)]
+
+def run_sync(inputs, concurrency):
+    clear_caches()
+    latencies, errors = [], []
+
+    def one(text):
+        started = time.perf_counter()
+        plan_sync(text)
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        futures = [pool.submit(one, text) for text in session_inputs(inputs, concurrency)]
+        for future in futures:
+            try:
+                latencies.append(future.result())
+            except Exception as e:
+                errors.append(f"{type(e).__name__}: {e}")
+    return time.perf_counter() - started, latencies, errors
+
+async def run_async(inputs, concurrency):
+    clear_caches()
+
+    async def one(text):
+        started = time.perf_counter()
+        await plan_async(text)
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    outcomes = await asyncio.gather(*(one(text) for text in session_inputs(inputs, concurrency)),
+                                    return_exceptions=True)
+    latencies = [o for o in outcomes if not isinstance(o, BaseException)]
+    errors = [f"{type(o).__name__}: {o}" for o in outcomes if isinstance(o, BaseException)]
+    return time.perf_counter() - started, latencies, errors
+
+def report(mode, concurrency, elapsed, latencies, errors, peak_threads):
+    row = {
+        "mode": mode,
+        "concurrency": concurrency,
+        "elapsed_s": round(elapsed, 3),
+        "sessions_per_s": round(concurrency / elapsed, 2) if elapsed else None,
+        "errors": len(errors),
+        "peak_extra_threads": peak_threads,
+    }
+    if errors:
+        row["first_error"] = errors[0][:300]
+    if latencies:
+        row["latency"] = summarize_ms(latencies)
+    return row
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32, 128])
+    parser.add_argument("--latency-ms", type=float, default=50, help="injected server latency per request")
+    parser.add_argument("--modes", nargs="+", choices=["sync", "async"], default=["sync", "async"])
+    parser.add_argument("--output", help="also write the JSON results to this file")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    inputs = load_inputs()
+    results = []
+
+    with locationiq_server(Faults(args.latency_ms, seed=1)) as liq, \
+            groq_server(Faults(args.latency_ms, seed=2)) as groq:
+        os.environ.setdefault("HTTP_POOL_SIZE", str(max(args.concurrency)))
+        configure_environment(liq.url, groq.url)
+
+        if "async" in args.modes:
+            async def run_all():
+                # one loop for every round, so the httpx and Groq pools stay warm
+                rows = []
+                await run_async(inputs, 2)
+                for n in args.concurrency:
+                    with ThreadSampler() as threads:
+                        elapsed, latencies, errors = await run_async(inputs, n)
+                    rows.append(report("async", n, elapsed, latencies, errors, threads.peak))
+                return rows
+            results += asyncio.run(run_all())
+
+        if "sync" in args.modes:
+            run_sync(inputs, 2)
+            for n in args.concurrency:
+                with ThreadSampler() as threads:
+                    elapsed, latencies, errors = run_sync(inputs, n)
+                results.append(report("sync", n, elapsed, latencies, errors, threads.peak))
+
+    output = {"benchmark": "async_tools_load", "latency_ms": args.latency_ms, "results": results}
+    print(json.dumps(output, indent=2))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(output, f, indent=2)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,266 @@
+"""
+Local stand-ins for the LocationIQ and Groq HTTP APIs, serving fixtures from
+benchmarks/fixtures with configurable latency and injected 429 responses.
+
+    python -m benchmarks.stub_servers --latency-ms 80 --rate-limit-every 10
+
+Point the app at them with LOCATIONIQ_BASE_URL=<locationiq url> and
+GROQ_API_BASE=<groq url> (any non-empty API keys will do).
+"""
+import argparse
+import json
+import os
+import random
+import threading
+import time
+from datetime import date, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+def load_fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return json.load(f)
+
+class Faults:
+    """
+    Latency and rate-limit injection shared by a server's handler threads.
+
+    latency_ms is added to every response (plus up to jitter_ms at random). Every
+    rate_limit_every-th request, or a rate_limit_ratio fraction of requests, is
+    answered with 429 and a retry-after header.
+    """
+    def __init__(self, latency_ms=0, jitter_ms=0, rate_limit_every=0, rate_limit_ratio=0.0,
+                 retry_after=1, seed=0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.rate_limit_every = rate_limit_every
+        self.rate_limit_ratio = rate_limit_ratio
+        self.retry_after = retry_after
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.rate_limited = 0
+
+    def delay(self):
+        with self._lock:
+            jitter = self._rng.uniform(0, self.jitter_ms) if self.jitter_ms else 0
+        if self.latency_ms or jitter:
+            time.sleep((self.latency_ms + jitter) / 1000)
+
+    def should_rate_limit(self):
+        with self._lock:
+            self.requests += 1
+            limited = (self.rate_limit_every and self.requests % self.rate_limit_every == 0) or \
+                (self.rate_limit_ratio and self._rng.random() < self.rate_limit_ratio)
+            if limited:
+                self.rate_limited += 1
+            return bool(limited)
+
+    def as_dict(self):
+        return {"requests": self.requests, "rate_limited": self.rate_limited}
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    # headers and body go out in separate writes; without this, delayed ACKs add ~40 ms
+    disable_nagle_algorithm = True
+    faults = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _rate_limited(self, payload):
+        self.faults.delay()
+        if self.faults.should_rate_limit():
+            self._send_json(429, payload, {"retry-after": str(self.faults.retry_after)})
+            return True
+        return False
+
+def _near(place, lat, lon, radius_deg):
+    return abs(float(place["lat"]) - lat) <= radius_deg and abs(float(place["lon"]) - lon) <= radius_deg
+
+class LocationIQHandler(_StubHandler):
+    """
+    search.php: limit=1 is treated as a geocode of q, otherwise as a text search whose
+    q must mention a fixture region. nearby.php returns fixture places around lat/lon.
+    """
+    fixture = None
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        if self._rate_limited({"error": "Rate Limited Second"}):
+            return
+        if not params.get("key"):
+            return self._send_json(401, {"error": "Invalid key"})
+        if url.path.endswith("/search.php"):
+            return self._search(params)
+        if url.path.endswith("/nearby.php"):
+            return self._nearby(params)
+        self._send_json(404, {"error": "Not found"})
+
+    def _region_in(self, text):
+        text = text.lower()
+        for region in sorted(self.fixture["geocode"], key=len, reverse=True):
+            if region in text:
+                return region
+        return None
+
+    def _search(self, params):
+        q = params.get("q", "")
+        region = self._region_in(q)
+        if region is None:
+            return self._send_json(404, {"error": "Unable to geocode"})
+        if params.get("limit") == "1":
+            return self._send_json(200, [self.fixture["geocode"][region]])
+        words = [w for w in q.lower().replace(region, " ").split() if w not in ("mumbai", "india")]
+        matches = [p for p in self.fixture["places"] if p["region"] == region and any(
+            w in p["name"].lower() or w in p["type"] for w in words)]
+        limit = int(params.get("limit", 20))
+        if not matches:
+            return self._send_json(404, {"error": "Unable to geocode"})
+        self._send_json(200, [{k: v for k, v in p.items() if k not in ("name", "region")} for p in matches[:limit]])
+
+    def _nearby(self, params):
+        lat, lon = float(params["lat"]), float(params["lon"])
+        radius_deg = int(params.get("radius", 5000)) / 111_000
+        limit = int(params.get("limit", 20))
+        results = [{k: v for k, v in p.items() if k != "region"}
+                   for p in self.fixture["places"] if _near(p, lat, lon, radius_deg)]
+        if not results:
+            return self._send_json(404, {"error": "No results found"})
+        self._send_json(200, results[:limit])
+
+class ChatCompletionsHandler(_StubHandler):
+    """
+    OpenAI-style /openai/v1/chat/completions (what the Groq SDK calls). The reply is the
+    first fixture completion whose "match" text appears in the last user message,
+    otherwise the fixture default. stream=true is answered as server-sent events.
+    """
+    fixture = None
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if self._rate_limited({"error": {"message": "Rate limit reached", "type": "tokens", "code": "rate_limit_exceeded"}}):
+            return
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            return self._send_json(404, {"error": {"message": "Unknown path"}})
+
+        content = self._completion_for(request.get("messages", []))
+        model = request.get("model", "stub")
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in request.get("messages", [])) // 4
+        usage = {"prompt_tokens": prompt_tokens, "completion_tokens": len(content) // 4,
+                 "total_tokens": prompt_tokens + len(content) // 4}
+        if request.get("stream"):
+            return self._stream(model, content, usage)
+        self._send_json(200, {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                         "finish_reason": "stop", "logprobs": None}],
+            "usage": usage,
+        })
+
+    def _completion_for(self, messages):
+        last = next((str(m.get("content", "")) for m in reversed(messages) if m.get("role") == "user"), "")
+        start = date.today() + timedelta(days=1)
+        for entry in self.fixture["completions"]:
+            if entry["match"].lower() in last.lower():
+                return entry["content"].replace("{start_date}", start.isoformat()).replace("{end_date}", start.isoformat())
+        return self.fixture["default"]
+
+    def _stream(self, model, content, usage, chunk_chars=16):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        base = {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()), "model": model}
+        pieces = [content[i:i + chunk_chars] for i in range(0, len(content), chunk_chars)]
+        for i, piece in enumerate(pieces):
+            delta = {"role": "assistant", "content": piece} if i == 0 else {"content": piece}
+            chunk = dict(base, choices=[{"index": 0, "delta": delta, "finish_reason": None}])
+            self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+        final = dict(base, choices=[{"index": 0, "delta": {}, "finish_reason": "stop"}], x_groq={"usage": usage})
+        self.wfile.write(f"data: {json.dumps(final)}\n\ndata: [DONE]\n\n".encode("utf-8"))
+        self.wfile.flush()
+
+class _Server(ThreadingHTTPServer):
+    # socketserver's default backlog of 5 drops connections under load tests
+    request_queue_size = 1024
+    daemon_threads = True
+
+class StubServer:
+    """
+    Runs a stub handler on 127.0.0.1 in a background thread. Usable as a context manager.
+    """
+    def __init__(self, handler, fixture, faults=None, port=0):
+        self.faults = faults or Faults()
+        handler_class = type(handler.__name__, (handler,), {"fixture": fixture, "faults": self.faults})
+        self.httpd = _Server(("127.0.0.1", port), handler_class)
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+def locationiq_server(faults=None, port=0):
+    return StubServer(LocationIQHandler, load_fixture("locationiq.json"), faults, port)
+
+def groq_server(faults=None, port=0):
+    return StubServer(ChatCompletionsHandler, load_fixture("groq.json"), faults, port)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--locationiq-port", type=int, default=8701)
+    parser.add_argument("--groq-port", type=int, default=8702)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--rate-limit-ratio", type=float, default=0.0)
+    args = parser.parse_args()
+
+    def faults():
+        return Faults(args.latency_ms, args.jitter_ms, args.rate_limit_every, args.rate_limit_ratio)
+
+    with locationiq_server(faults(), args.locationiq_port) as liq, groq_server(faults(), args.groq_port) as groq:
+        print(f"LOCATIONIQ_BASE_URL={liq.url}/v1")
+        print(f"GROQ_API_BASE={groq.url}")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+
+if __name__ == "__main__":
+    main()
@@ -3,35 +3,90 @@ from tools.agent_tools import (
     nlu_tool,
     slot_generator_tool,
     location_finder_tool,
-    budget_estimator_tool,
+    batch_budget_estimator_tool,
     slot_selection_tool,
 )
-from fpdf import FPDF
-import folium
-from streamlit_folium import st_folium
-from langchain_groq import ChatGroq
+import streamlit.components.v1 as components
+from datetime import date
+from utils.llm_gateway import llm_call, llm_stream, PRIORITY_INTERACTIVE
+from agents.conversation import build_chat_messages, roll_history, plan_context
+from utils.pdf_export import render_plan_pdf
+from utils.venue_map import venue_points, render_venue_map_html
 
 st.set_page_config(page_title="Event Planner AI", page_icon="🎉")
 
-chatgroq_client = ChatGroq(model="llama3-70b-8192")
-
-def chatgroq_conversation(user_input, history=[]):
-    messages = [{"role": "system", "content": "You are an event planning assistant."}]
-    for h in history:
-        messages.append({"role": "user", "content": h["user"]})
-        messages.append({"role": "assistant", "content": h["assistant"]})
-    messages.append({"role": "user", "content": user_input})
-    response = chatgroq_client.invoke(messages)
+VENUE_CARD_COLUMNS = 4
+
+@st.cache_resource
+def get_chat_client():
+    # built once per server process instead of on every script rerun
+    from langchain_groq import ChatGroq
+    # retries are owned by the shared LLM gateway
+    return ChatGroq(model="llama3-70b-8192", max_retries=0)
+
+def chatgroq_conversation(user_input, history=None, summary="", plan="", stream=False):
+    """
+    Answers a follow-up question. history should already be windowed (see roll_history);
+    older turns travel in summary and the current plan in plan. With stream=True a
+    generator of text chunks is returned instead of the full answer.
+    """
+    messages = build_chat_messages(user_input, history, summary, plan)
+    if stream:
+        chunks = llm_stream(get_chat_client().stream, messages, priority=PRIORITY_INTERACTIVE)
+        return (chunk.content for chunk in chunks)
+    response = llm_call(get_chat_client().invoke, messages, priority=PRIORITY_INTERACTIVE)
     return response.content
 
-def create_pdf(plan_text, filename="event_plan.pdf"):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_font("Arial", size=12)
-    for line in plan_text.split("\n"):
-        pdf.cell(200, 10, txt=line, ln=1)
-    pdf.output(filename)
-    return filename
+def create_pdf(plan_text):
+    # rendered in memory, so concurrent sessions never share a file on disk
+    return render_plan_pdf(plan_text)
+
+# Pipeline stages are memoized on their inputs, so a rerun triggered by an unrelated
+# widget (PDF button, follow-up chat) only recomputes stages whose inputs changed.
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def run_nlu(user_input, reference_date):
+    # reference_date is part of the key so relative dates are re-parsed after midnight
+    details = nlu_tool.invoke({"user_input": user_input})
+    if "error" in details:
+        # raising keeps failed parses out of the cache
+        raise ValueError(details["error"])
+    return details
+
+@st.cache_data(show_spinner=False, max_entries=256, ttl=3600)
+def run_location_finder(location, query_type, brand_name):
+    return location_finder_tool.invoke({
+        "location": location,
+        "query_type": query_type,
+        "brand_name": brand_name
+    })
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def run_slot_generator(start_date, end_date, duration_hours):
+    return slot_generator_tool.invoke({
+        "start_date": start_date,
+        "end_date": end_date,
+        "duration_hours": duration_hours
+    })
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def run_slot_selection(event_name, feasible_slots):
+    return slot_selection_tool.invoke({
+        "event_name": event_name,
+        "feasible_slots": feasible_slots
+    })
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def run_budget_estimates(number_of_people, venues):
+    return batch_budget_estimator_tool.invoke({
+        "number_of_people": number_of_people,
+        "venues": venues
+    })["budget_estimates"]
+
+@st.cache_data(show_spinner=False, max_entries=64)
+def run_venue_map(points):
+    # keyed on the (name, lat, lon) tuple, so reruns reuse the generated HTML
+    return render_venue_map_html(points)
 
 st.title("Your Event Planner AI")
 st.write("Plan your events professionally with AI assistance.")
@@ -39,23 +94,28 @@ st.write("Plan your events professionally with AI assistance.")
 user_input = st.text_input("Enter your event request:")
 
 if user_input:
-    event_details = nlu_tool.invoke({"user_input": user_input})
+    try:
+        event_details = run_nlu(user_input, date.today().isoformat())
+    except ValueError as e:
+        st.error(f"Could not understand the request: {e}")
+        st.stop()
     st.success("✅ Event details extracted.")
     st.json(event_details)
 
     # Location finder
-    venues_result = location_finder_tool.invoke({
-        "location": event_details["location"],
-        "query_type": event_details["query_type"],
-        "brand_name": event_details.get("brand_name") or ""
-    })
+    venues_result = run_location_finder(
+        event_details["location"],
+        event_details["query_type"],
+        event_details.get("brand_name") or ""
+    )
     venues = venues_result.get("nearby_places", [])
 
     if venues:
         st.subheader("🏠 Available Venues")
-        cols = st.columns(len(venues))
         for idx, place in enumerate(venues):
-            with cols[idx]:
+            if idx % VENUE_CARD_COLUMNS == 0:
+                cols = st.columns(VENUE_CARD_COLUMNS)
+            with cols[idx % VENUE_CARD_COLUMNS]:
                 st.markdown(f"""
                 **{place['name']}**
 
@@ -66,40 +126,29 @@ if user_input:
                 """)
 
         st.subheader("🗺️ Venue Locations Map")
-        m = folium.Map(location=[float(venues[0]['latitude']), float(venues[0]['longitude'])], zoom_start=14)
-        for place in venues:
-            folium.Marker(
-                [float(place['latitude']), float(place['longitude'])],
-                popup=place['name'],
-            ).add_to(m)
-        st_folium(m, width=700, height=500)
-
-    slots_result = slot_generator_tool.invoke({
-        "start_date": event_details["start_date"],
-        "end_date": event_details["end_date"],
-        "duration_hours": event_details["duration_hours"]
-    })
+        map_html = run_venue_map(venue_points(venues))
+        if map_html:
+            components.html(map_html, height=500)
+
+    slots_result = run_slot_generator(
+        event_details["start_date"],
+        event_details["end_date"],
+        event_details["duration_hours"]
+    )
     slots = slots_result.get("feasible_slots", [])
     if slots:
         st.subheader("🗓️ Available Slots")
         for slot in slots:
             st.write(f"{slot['date']} | {slot['start_time']} - {slot['end_time']}")
 
-    selected_slot_result = slot_selection_tool.invoke({
-        "event_name": event_details["event_name"],
-        "feasible_slots": slots
-    })
+    selected_slot_result = run_slot_selection(event_details["event_name"], slots)
     selected_slot = selected_slot_result.get("selected_slot")
     if selected_slot:
         st.success(f"✅ Selected Slot: {selected_slot['date']} | {selected_slot['start_time']} - {selected_slot['end_time']}")
 
     st.subheader("💰 Budget Estimates")
-    for place in venues:
-        estimate = budget_estimator_tool.invoke({
-            "number_of_people": event_details["number_of_people"],
-            "location": place["name"]
-        })
-        budget = estimate["budget_estimate"]
+    budgets = run_budget_estimates(event_details["number_of_people"], venues)
+    for place, budget in zip(venues, budgets):
         st.markdown(f"""
         **{place['name']}, {place.get('address')}**
 
@@ -119,20 +168,40 @@ Venue Options:
     st.subheader("📄 Final Plan Summary")
     st.text(final_plan)
 
-    if st.button("📥 Download Plan as PDF"):
-        pdf_file = create_pdf(final_plan)
-        with open(pdf_file, "rb") as f:
-            st.download_button("Download PDF", f, file_name=pdf_file, mime="application/pdf")
+    st.session_state.plan_context = plan_context(event_details, venues, selected_slot, budgets)
+
+    st.download_button(
+        "📥 Download Plan as PDF",
+        create_pdf(final_plan),
+        file_name="event_plan.pdf",
+        mime="application/pdf"
+    )
 
 st.divider()
 st.subheader("💬 Chat with Event Planner AI")
 
 if "chat_history" not in st.session_state:
     st.session_state.chat_history = []
+    st.session_state.chat_summary = ""
+    st.session_state.last_chat_question = None
 
 user_q = st.text_input("Ask follow-up question:")
 
-if user_q:
-    answer = chatgroq_conversation(user_q, st.session_state.chat_history)
+# any widget interaction reruns the script with the same text still in the box;
+# only a new question goes to the model, a repeat shows the stored answer
+if user_q and user_q == st.session_state.last_chat_question and st.session_state.chat_history:
+    st.markdown(st.session_state.chat_history[-1]["assistant"])
+elif user_q:
+    recent, st.session_state.chat_summary = roll_history(
+        st.session_state.chat_history, st.session_state.chat_summary
+    )
+    st.session_state.chat_history = recent
+    answer = st.write_stream(chatgroq_conversation(
+        user_q,
+        recent,
+        summary=st.session_state.chat_summary,
+        plan=st.session_state.get("plan_context", ""),
+        stream=True
+    ))
     st.session_state.chat_history.append({"user": user_q, "assistant": answer})
-    st.write(answer)
+    st.session_state.last_chat_question = user_q
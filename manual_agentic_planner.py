@@ -1,40 +1,44 @@
-import json
-import time
 import os
-import regex as re
 from groq import Groq
 from dotenv import load_dotenv
-from groq._exceptions import RateLimitError
+from utils.llm_gateway import llm_call, RateLimitExceeded
+from utils.json_stream import extract_json_from_stream
 
+from tools.executor import normalize_calls, execute_calls
+from tools.context import AgentContext
 from tools.agent_tools import (
     nlu_tool,
     slot_generator_tool,
     location_finder_tool,
     budget_estimator_tool,
+    batch_budget_estimator_tool,
     slot_selection_tool
 )
 
 load_dotenv()
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
-groq_client = Groq(api_key=GROQ_API_KEY)
+_groq_client = None
+
+def get_groq_client():
+    global _groq_client
+    if _groq_client is None:
+        # retries are owned by the shared LLM gateway
+        _groq_client = Groq(api_key=GROQ_API_KEY, max_retries=0)
+    return _groq_client
 
 TOOLS = {
     "nlu_tool": nlu_tool,
     "slot_generator_tool": slot_generator_tool,
     "location_finder_tool": location_finder_tool,
     "budget_estimator_tool": budget_estimator_tool,
+    "batch_budget_estimator_tool": batch_budget_estimator_tool,
     "slot_selection_tool": slot_selection_tool,
 }
 
-def extract_json(text):
-    json_pattern = re.compile(r"\{(?:[^{}]|(?R))*\}", re.DOTALL)
-    match = json_pattern.search(text)
-    if match:
-        try:
-            return json.loads(match.group())
-        except json.JSONDecodeError:
-            return None
-    return None
+def stream_text(stream):
+    for chunk in stream:
+        if chunk.choices:
+            yield chunk.choices[0].delta.content
 
 def build_final_output(event_name, slot, budget_estimates, number_of_people):
     """
@@ -60,94 +64,106 @@ Per Person: {budget['currency']}{budget['per_person_cost']}
     output += f"\n\nEnjoy your {event_name.lower()}!"
     return output
 
-messages = [
-    {
-        "role": "system",
-        "content": (
-            "You are EventPlanner, a friendly and professional event planning assistant.\n"
-            "If user input is chit-chat or general questions, respond conversationally.\n"
-            "If user requests event planning, output a single valid JSON with tool calls.\n"
-            "Available tools: nlu_tool, slot_generator_tool, slot_selection_tool, location_finder_tool, budget_estimator_tool.\n"
-            "When providing feasible slots or nearby places, output them as lists before finalizing the plan.\n"
-            "When calling location_finder_tool, ensure you pass both location and query_type.\n"
-            "Use slot_generator_tool after parsing event details and pass start_date, end_date, and duration_hours.\n"
-            "Use slot_selection_tool after generating feasible slots to select the best slot based on event type and user context.\n"
-            "When calling slot_selection_tool, ensure you pass both event_name and feasible_slots.\n"
-            "Example: {\"tool\": \"nlu_tool\", \"args\": {\"user_input\": \"Plan dinner tomorrow in Malad\"}}.\n"
-            "When the plan is ready, respond with:\n"
-            "{\"tool\": \"finish\", \"args\": {\"result\": \"<final_plan_here>\"}}."
-        )
-    }
-]
+def report_result(tool_name, result):
+    if tool_name == "location_finder_tool":
+        venues = result.get("nearby_places")
+        if venues:
+            print("\n ---------- AVAILABLE VENUES ----------")
+            for idx, place in enumerate(venues, 1):
+                print(f"{idx}. {place['name']} (Lat: {place['latitude']}, Lon: {place['longitude']})")
+        else:
+            print("\nNo venues found for the specified query and location.")
+
+    if tool_name == "slot_generator_tool":
+        slots = result.get("feasible_slots")
+        if slots:
+            print("\n ---------- AVAILABLE SLOTS ----------")
+            for idx, slot in enumerate(slots, 1):
+                print(f"{idx}. Date: {slot['date']}, Time: {slot['start_time']} to {slot['end_time']}")
+        else:
+            print("\nNo feasible slots found.")
+
+context = AgentContext(
+    (
+        "You are EventPlanner, a friendly and professional event planning assistant.\n"
+        "If user input is chit-chat or general questions, respond conversationally.\n"
+        "If user requests event planning, output a single valid JSON with tool calls.\n"
+        "Available tools: nlu_tool, slot_generator_tool, slot_selection_tool, location_finder_tool, budget_estimator_tool, batch_budget_estimator_tool.\n"
+        "To estimate budgets for several venues, call batch_budget_estimator_tool once with number_of_people and the venues list.\n"
+        "When providing feasible slots or nearby places, output them as lists before finalizing the plan.\n"
+        "When calling location_finder_tool, ensure you pass both location and query_type.\n"
+        "Use slot_generator_tool after parsing event details and pass start_date, end_date, and duration_hours.\n"
+        "Use slot_selection_tool after generating feasible slots to select the best slot based on event type and user context.\n"
+        "When calling slot_selection_tool, ensure you pass both event_name and feasible_slots.\n"
+        "Example: {\"tool\": \"nlu_tool\", \"args\": {\"user_input\": \"Plan dinner tomorrow in Malad\"}}.\n"
+        "To run several tools in one turn, output {\"tool_calls\": [{\"id\": \"<id>\", \"tool\": \"<name>\", \"args\": {...}}, ...]}.\n"
+        "An argument may reference an earlier call in the same turn as \"$<id>.<field>\", e.g. \"$nlu.start_date\"; "
+        "calls that do not reference each other run in parallel.\n"
+        "When the plan is ready, respond with:\n"
+        "{\"tool\": \"finish\", \"args\": {\"result\": \"<final_plan_here>\"}}.\n"
+        "Large results such as slot and venue lists are stored and shown in short form with a handle like \"@r2\"; "
+        "pass the handle string as the argument value (e.g. \"feasible_slots\": \"@r2\") to reuse the full list."
+    )
+)
 
 print("----- Welcome to Event Planner AI -----")
 user_input = input("You: ")
-messages.append({"role": "user", "content": user_input})
+context.add_user(user_input)
 
 event_data = {}
 
 while True:
     try:
-        response = groq_client.chat.completions.create(
+        stream = llm_call(
+            get_groq_client().chat.completions.create,
             model="llama3-70b-8192",
-            messages=messages,
-            temperature=0.3
+            messages=context.messages,
+            temperature=0.3,
+            stream=True
         )
 
-        content = response.choices[0].message.content
-        parsed = extract_json(content)
+        # dispatch a tool call as soon as its JSON object closes instead of waiting for the full completion
+        chunks = stream_text(stream)
+        parsed, content = extract_json_from_stream(chunks)
+        is_tool_call = bool(parsed and (parsed.get("tool") or parsed.get("tool_calls")))
+        if is_tool_call:
+            stream.close()
+        else:
+            # a plain reply may quote JSON; keep reading so it is not cut off
+            content += "".join(chunk for chunk in chunks if chunk)
 
-        if parsed and parsed.get("tool"):
-            tool_name = parsed["tool"]
-            args = parsed.get("args", {})
+        if is_tool_call:
+            calls = normalize_calls(parsed)
 
-            if tool_name == "finish":
+            finish = next((call for call in calls if call["tool"] == "finish"), None)
+            if finish:
                 print("\n Final Event Plan:")
-                print(args.get("result"))
+                print(finish["args"].get("result"))
                 break
 
-            tool_func = TOOLS.get(tool_name)
-            if tool_func:
-                print(f"\n🔧 Executing {tool_name}...")
-                result = tool_func.invoke(args)
-                messages.append({"role": "assistant", "content": json.dumps(parsed)})
-                messages.append({"role": "user", "content": json.dumps(result)})
-
-                if tool_name == "location_finder_tool":
-                    venues = result.get("nearby_places")
-                    if venues:
-                        print("\n ---------- AVAILABLE VENUES ----------")
-                        for idx, place in enumerate(venues, 1):
-                            print(f"{idx}. {place['name']} (Lat: {place['latitude']}, Lon: {place['longitude']})")
-                    else:
-                        print("\nNo venues found for the specified query and location.")
-
-                if tool_name == "slot_generator_tool":
-                    slots = result.get("feasible_slots")
-                    if slots:
-                        print("\n ---------- AVAILABLE SLOTS ----------")
-                        for idx, slot in enumerate(slots, 1):
-                            print(f"{idx}. Date: {slot['date']}, Time: {slot['start_time']} to {slot['end_time']}")
-                    else:
-                        print("\nNo feasible slots found.")
-
-                event_data.update(result)
-
-            else:
-                print(f" Unknown tool: {tool_name}")
+            unknown = [call["tool"] for call in calls if call["tool"] not in TOOLS]
+            if unknown:
+                print(f" Unknown tool: {', '.join(map(str, unknown))}")
                 break
 
+            print(f"\n🔧 Executing {', '.join(call['tool'] for call in calls)}...")
+            outcomes = execute_calls(calls, TOOLS, arg_resolver=context.resolve)
+            context.add_tool_results(parsed, outcomes)
+
+            for outcome in outcomes:
+                report_result(outcome["tool"], outcome["result"])
+                event_data.update(outcome["result"])
+
         else:
             print('\n')
             print(f"AI: {content}")
             print('\n')
             user_input = input("You: ")
-            messages.append({"role": "user", "content": user_input})
+            context.add_user(user_input)
 
-    except RateLimitError as e:
-        retry_after = getattr(e, 'retry_after', 2)
-        print(f" Rate limit hit. Retrying after {retry_after} seconds.")
-        time.sleep(retry_after)
+    except RateLimitExceeded as e:
+        print(f" Rate limit persists: {e}. Please try again later.")
+        break
 
     except KeyboardInterrupt:
         print("\n Exiting. Goodbye!")
@@ -164,15 +180,10 @@ try:
         number_of_people = event_data.get("number_of_people", 2)
         event_name = event_data.get("event_name", "Event")
 
-        budget_estimates = []
-        for place in venues:
-            budget_result = budget_estimator_tool.invoke({
-                "number_of_people": number_of_people,
-                "location": place['name']
-            })
-            budget_estimate = budget_result.get("budget_estimate", {})
-            budget_estimate["place_name"] = place["name"]
-            budget_estimates.append(budget_estimate)
+        budget_estimates = batch_budget_estimator_tool.invoke({
+            "number_of_people": number_of_people,
+            "venues": venues
+        }).get("budget_estimates", [])
 
         final_plan = build_final_output(
             event_name=event_name,
@@ -0,0 +1,22 @@
+import pytest
+from benchmarks.stub_servers import locationiq_server
+from utils.cache import TTLCache
+
+@pytest.fixture(scope="session")
+def locationiq():
+    with locationiq_server() as server:
+        yield server
+
+@pytest.fixture
+def finder(locationiq, monkeypatch):
+    """
+    agents.location_finder pointed at the LocationIQ stub, with a fresh in-memory
+    geocode cache and the gazetteer and venue store switched off.
+    """
+    from agents import location_finder
+    monkeypatch.setenv("LOCATIONIQ_API_KEY", "stub")
+    monkeypatch.setattr(location_finder, "LOCATIONIQ_BASE_URL", f"{locationiq.url}/v1")
+    monkeypatch.setattr(location_finder, "USE_GAZETTEER", False)
+    monkeypatch.setattr(location_finder, "USE_VENUE_STORE", False)
+    monkeypatch.setattr(location_finder, "_geocode_cache", TTLCache(maxsize=64, ttl=60))
+    return location_finder
@@ -0,0 +1,19 @@
+import asyncio
+from datetime import date, datetime, timedelta
+from tools.agent_tools import slot_generator_tool
+
+def _minutes(slot):
+    start = datetime.strptime(slot["start_time"], "%H:%M")
+    end = datetime.strptime(slot["end_time"], "%H:%M")
+    return (end - start).seconds // 60
+
+def test_slot_generator_accepts_fractional_hours():
+    day = (date.today() + timedelta(days=1)).isoformat()
+    slots = slot_generator_tool.invoke({"start_date": day, "end_date": day, "duration_hours": 0.5})["feasible_slots"]
+    assert slots
+    assert {_minutes(slot) for slot in slots} == {30}
+
+def test_slot_generator_accepts_fractional_hours_async():
+    day = (date.today() + timedelta(days=1)).isoformat()
+    result = asyncio.run(slot_generator_tool.ainvoke({"start_date": day, "duration_hours": 1.5}))
+    assert {_minutes(slot) for slot in result["feasible_slots"]} == {90}
@@ -0,0 +1,22 @@
+from types import SimpleNamespace
+import pytest
+import batch_runner
+from agents import nlu_agent
+from utils.cache import TTLCache
+from utils.llm_gateway import PRIORITY_BATCH
+
+def test_batch_nlu_calls_use_batch_priority(monkeypatch):
+    priorities = []
+
+    def fake_llm_call(fn, *args, priority, **kwargs):
+        priorities.append(priority)
+        return SimpleNamespace(content="no JSON here")
+
+    monkeypatch.setattr(nlu_agent, "llm_call", fake_llm_call)
+    monkeypatch.setattr(nlu_agent, "get_llm", lambda: SimpleNamespace(invoke=None))
+    monkeypatch.setattr(nlu_agent, "_nlu_cache", TTLCache(maxsize=8))
+
+    with pytest.raises(batch_runner.StageError) as excinfo:
+        batch_runner.plan_request("something fun with friends sometime", {})
+    assert excinfo.value.stage == "nlu"
+    assert priorities == [PRIORITY_BATCH]
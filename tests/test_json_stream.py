@@ -0,0 +1,25 @@
+from utils.json_stream import IncrementalJSONExtractor, extract_json, extract_json_from_stream
+
+TOOL_TEXT = 'Use { then {"tool": "nlu_tool", "args": {"text": "dinner in malad"}} and stop.'
+TOOL_CALL = {"tool": "nlu_tool", "args": {"text": "dinner in malad"}}
+
+def test_extracts_object_from_prose():
+    assert extract_json('Sure:\n```json\n{"a": {"b": "}"}}\n```') == {"a": {"b": "}"}}
+
+def test_skips_balanced_invalid_candidate():
+    assert extract_json('{not json} then {"a": 1}') == {"a": 1}
+
+def test_skips_unmatched_brace_before_object():
+    assert extract_json(TOOL_TEXT) == TOOL_CALL
+
+def test_skips_unmatched_brace_in_stream():
+    chunks = [TOOL_TEXT[i:i + 7] for i in range(0, len(TOOL_TEXT), 7)]
+    parsed, text = extract_json_from_stream(chunks)
+    assert parsed == TOOL_CALL
+    assert text == TOOL_TEXT
+
+def test_finish_without_object_returns_none():
+    extractor = IncrementalJSONExtractor()
+    extractor.feed("{ { {")
+    assert extractor.finish() is None
+    assert extract_json("no json here") is None
@@ -0,0 +1,47 @@
+import asyncio
+import time
+from utils.llm_gateway import LLMGateway
+
+async def _echo(value):
+    return value
+
+def test_cancelled_async_call_leaves_queue_without_taking_capacity():
+    gateway = LLMGateway(requests_per_minute=60, tokens_per_minute=10 ** 9)
+    gateway.requests.tokens = 0.0  # refills at one request per second from here
+    started = time.monotonic()
+
+    async def cancel_while_queued():
+        task = asyncio.ensure_future(gateway.acall(_echo, "x"))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        await asyncio.sleep(0.1)
+
+    asyncio.run(cancel_while_queued())
+    assert gateway._queue == []
+    time.sleep(1.2)
+    # nothing was consumed, so everything refilled since the start is still there
+    assert gateway.requests.wait_time(time.monotonic() - started - 0.2) == 0
+    assert gateway.stats["calls"] == 0
+
+def test_refund_restores_consumed_capacity():
+    gateway = LLMGateway(requests_per_minute=60, tokens_per_minute=600)
+    gateway.requests.consume(1)
+    gateway.tokens.consume(100)
+    gateway.requests.refund(1)
+    gateway.tokens.refund(100)
+    assert gateway.requests.wait_time(60) == 0
+    assert gateway.tokens.wait_time(600) == 0
+
+def test_async_calls_queue_in_priority_order():
+    gateway = LLMGateway(requests_per_minute=600, tokens_per_minute=10 ** 9)
+    gateway.requests.tokens = 0.0
+
+    async def run():
+        return await asyncio.gather(*(gateway.acall(_echo, i) for i in range(3)))
+
+    assert asyncio.run(run()) == [0, 1, 2]
+    assert gateway.stats["calls"] == 3
@@ -0,0 +1,41 @@
+import asyncio
+
+def test_unknown_region_is_negative_cached(finder, locationiq):
+    before = locationiq.faults.requests
+    for _ in range(3):
+        assert finder.geocode_region("Atlantis", "stub") == (None, None)
+    assert locationiq.faults.requests - before == 1
+    stats = finder.get_geocode_cache().stats
+    assert stats.negative_hits == 2
+
+def test_unknown_region_is_negative_cached_async(finder, locationiq):
+    async def lookups():
+        return [await finder.ageocode_region("Atlantis", "stub") for _ in range(3)]
+
+    before = locationiq.faults.requests
+    assert asyncio.run(lookups()) == [(None, None)] * 3
+    assert locationiq.faults.requests - before == 1
+
+def test_known_region_is_cached(finder, locationiq):
+    lat, lon = finder.geocode_region("malad", "stub")
+    assert (float(lat), float(lon)) == (19.1874, 72.8484)
+    before = locationiq.faults.requests
+    assert finder.geocode_region("Malad", "stub") == (lat, lon)
+    assert locationiq.faults.requests == before
+
+def _max_distance_km(places, lat, lon):
+    from utils.geo import distances_km
+    return max(distances_km(float(lat), float(lon),
+                            [float(p["latitude"]) for p in places],
+                            [float(p["longitude"]) for p in places]))
+
+def test_concurrent_search_honours_radius(finder):
+    wide = finder.find_places(None, "restaurant", "malad", concurrent=True)
+    near = finder.find_places(None, "restaurant", "malad", concurrent=True, radius=1000)
+    assert 0 < len(near) < len(wide)
+    assert _max_distance_km(near, 19.1874, 72.8484) <= 1.0
+
+def test_concurrent_search_honours_radius_async(finder):
+    near = asyncio.run(finder.afind_places(None, "restaurant", "malad", concurrent=True, radius=1000))
+    assert near
+    assert _max_distance_km(near, 19.1874, 72.8484) <= 1.0
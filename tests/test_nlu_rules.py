@@ -0,0 +1,38 @@
+from datetime import datetime
+import pytest
+from agents.nlu_rules import rule_based_parse
+
+REFERENCE = datetime(2026, 10, 18)
+
+@pytest.mark.parametrize("text, location, people, hours", [
+    ("plan a dinner tomorrow for 3 hours for 4 people in malad", "Malad", 4, 3),
+    ("dinner tomorrow in the evening for 2 hours in bandra", "Bandra", 2, 2),
+    ("dinner tomorrow for 2 hours for 4 adults in powai", "Powai", 4, 2),
+    ("dinner tonight for 2 hours with a couple of friends in khar", "Khar", 2, 2),
+    ("coffee at starbucks tomorrow at 5pm for half an hour in andheri", "Andheri", 2, 0.5),
+    ("lunch on 12 november for 1.5 hours with 3 colleagues in lower parel", "Lower Parel", 3, 1.5),
+])
+def test_confident_parses(text, location, people, hours):
+    parsed = rule_based_parse(text, REFERENCE)
+    assert (parsed["location"], parsed["number_of_people"], parsed["duration_hours"]) == (location, people, hours)
+
+@pytest.mark.parametrize("text", [
+    # time of day is not a place, and two places are ambiguous
+    "lunch tomorrow for 2 hours in the afternoon",
+    "dinner tomorrow for 2 hours in malad not bandra",
+    "dinner tomorrow for 2 hours in malad near bandra",
+    # a number that may be a headcount the pattern did not recognise
+    "dinner for 6 tomorrow for 2 hours in malad",
+    "a party of 8 tomorrow for 3 hours in bandra",
+    "dinner tomorrow for 2 hours in powai, 10 people",
+    "dinner tomorrow for 2 hours with 5 of my friends in powai",
+    # zero duration, and more than one date phrase
+    "dinner tomorrow for 0 hours in powai",
+    "dinner tomorrow for 2 hours in powai in 2 days",
+])
+def test_uncertain_parses_fall_back_to_llm(text):
+    assert rule_based_parse(text, REFERENCE) is None
+
+def test_day_after_tomorrow_is_one_date_phrase():
+    parsed = rule_based_parse("dinner day after tomorrow for 2 hours in juhu", REFERENCE)
+    assert parsed["start_date"] == "2026-10-20"
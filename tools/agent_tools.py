@@ -1,12 +1,16 @@
 # tools/agent_tools.py
 
-from langchain.tools import tool
-from agents.nlu_agent import parse_event_prompt
-from agents.location_finder import find_places
+from langchain_core.tools import tool
+from agents.nlu_agent import parse_event_prompt, aparse_event_prompt
+from agents.location_finder import find_places, afind_places
 from agents.event_scheduler import generate_feasible_slots
-from agents.budget_estimator import estimate_budget
+from agents.slot_ranking import rank_slots
+from agents.budget_estimator import estimate_budget, estimate_budgets
+from agents.availability import get_booking_store
+from utils.tracing import traced, current_span
 
 @tool
+@traced("tool.nlu_tool")
 def nlu_tool(user_input: str) -> dict:
     """
     Perform natural language understanding on user input to extract event details.
@@ -20,6 +24,7 @@ def nlu_tool(user_input: str) -> dict:
     return parse_event_prompt(user_input)
 
 @tool
+@traced("tool.location_finder_tool")
 def location_finder_tool(location: str, query_type: str = "restaurant", brand_name: str = None) -> dict:
     """
     Find nearby places based on location, query type, and optional brand.
@@ -33,56 +38,51 @@ def location_finder_tool(location: str, query_type: str = "restaurant", brand_na
         dict: Dictionary containing a list of nearby places with their details.
     """
     places = find_places(brand_name, query_type, location)
+    current_span().set("result_count", len(places))
     return {"nearby_places": places}
 
 @tool
-def slot_generator_tool(start_date: str, end_date: str = None, duration_hours: int = 1) -> dict:
+@traced("tool.slot_generator_tool")
+def slot_generator_tool(start_date: str, end_date: str = None, duration_hours: float = 1, venue: str = None) -> dict:
     """
     Generate feasible time slots for the event.
 
     Args:
         start_date (str): Start date for slot generation.
         end_date (str, optional): End date for slot generation. Defaults to start_date.
-        duration_hours (int, optional): Duration of each slot in hours. Defaults to 1.
+        duration_hours (float, optional): Duration of each slot in hours, e.g. 0.5 for half an hour. Defaults to 1.
+        venue (str, optional): Venue name; if given, slots clashing with its existing bookings are dropped.
 
     Returns:
         dict: Dictionary containing a list of feasible slots with timings.
     """
     if end_date is None:
         end_date = start_date
-    slots = generate_feasible_slots(start_date, end_date, duration_hours)
+    availability = get_booking_store() if venue else None
+    slots = generate_feasible_slots(start_date, end_date, duration_hours, availability=availability, venue=venue)
+    current_span().set("result_count", len(slots))
     return {"feasible_slots": slots}
 
 @tool
-def slot_selection_tool(event_name: str, feasible_slots: list) -> dict:
+@traced("tool.slot_selection_tool")
+def slot_selection_tool(event_name: str, feasible_slots: list, top_k: int = 3) -> dict:
     """
     Select the most suitable slot based on event type.
 
     Args:
         event_name (str): The name of the event (e.g. lunch, dinner).
         feasible_slots (list): List of feasible slots.
+        top_k (int, optional): Number of ranked alternatives to return. Defaults to 3.
 
     Returns:
-        dict: Dictionary containing the selected slot.
+        dict: Dictionary containing the selected slot and the top ranked slots.
     """
-    selected = feasible_slots[0]
-    if feasible_slots:
-        if "date" in event_name.lower():
-            evening_slots = [slot for slot in feasible_slots if int(slot['start_time'].split(":")[0]) >= 17]
-            if evening_slots:
-                selected = evening_slots[0]
-        elif "lunch" in event_name.lower():
-            lunch_slots = [slot for slot in feasible_slots if 12 <= int(slot['start_time'].split(":")[0]) < 15]
-            if lunch_slots:
-                selected = lunch_slots[0]
-        elif "dinner" in event_name.lower():
-            dinner_slots = [slot for slot in feasible_slots if int(slot['start_time'].split(":")[0]) >= 19]
-            if dinner_slots:
-                selected = dinner_slots[0]
-
-    return {"selected_slot": selected}
+    ranked = rank_slots(feasible_slots, event_name, top_k=max(top_k, 1))
+    current_span().update(candidate_count=len(feasible_slots), result_count=len(ranked))
+    return {"selected_slot": ranked[0] if ranked else None, "ranked_slots": ranked}
 
 @tool
+@traced("tool.budget_estimator_tool")
 def budget_estimator_tool(number_of_people: int = 1, location: str = "unknown") -> dict:
     """
     Estimate budget for the event based on location and number of people.
@@ -96,3 +96,54 @@ def budget_estimator_tool(number_of_people: int = 1, location: str = "unknown")
     """
     budget = estimate_budget(number_of_people, location)
     return {"budget_estimate": budget}
+
+@tool
+@traced("tool.batch_budget_estimator_tool")
+def batch_budget_estimator_tool(number_of_people: int, venues: list, seed: int = 0) -> dict:
+    """
+    Estimate budgets for a whole list of venues in a single call.
+
+    Args:
+        number_of_people (int): Number of attendees.
+        venues (list): Venues as returned by location_finder_tool, or plain venue names.
+        seed (int, optional): Seed for the deterministic price variation. Defaults to 0.
+
+    Returns:
+        dict: Dictionary containing one budget estimate per venue, in input order.
+    """
+    estimates = estimate_budgets(venues, number_of_people, seed)
+    current_span().set("result_count", len(estimates))
+    return {"budget_estimates": estimates}
+
+# Native async implementations behind the same tool names, used by ainvoke/astream.
+# The I/O-bound tools await the shared httpx pool and ChatGroq.ainvoke; the CPU-bound
+# ones finish in well under a millisecond, so they run inline rather than in a thread.
+
+@traced("tool.nlu_tool")
+async def _anlu_tool(user_input: str) -> dict:
+    return await aparse_event_prompt(user_input)
+
+@traced("tool.location_finder_tool")
+async def _alocation_finder_tool(location: str, query_type: str = "restaurant", brand_name: str = None) -> dict:
+    places = await afind_places(brand_name, query_type, location)
+    current_span().set("result_count", len(places))
+    return {"nearby_places": places}
+
+async def _aslot_generator_tool(start_date: str, end_date: str = None, duration_hours: float = 1, venue: str = None) -> dict:
+    return slot_generator_tool.func(start_date, end_date, duration_hours, venue)
+
+async def _aslot_selection_tool(event_name: str, feasible_slots: list, top_k: int = 3) -> dict:
+    return slot_selection_tool.func(event_name, feasible_slots, top_k)
+
+async def _abudget_estimator_tool(number_of_people: int = 1, location: str = "unknown") -> dict:
+    return budget_estimator_tool.func(number_of_people, location)
+
+async def _abatch_budget_estimator_tool(number_of_people: int, venues: list, seed: int = 0) -> dict:
+    return batch_budget_estimator_tool.func(number_of_people, venues, seed)
+
+nlu_tool.coroutine = _anlu_tool
+location_finder_tool.coroutine = _alocation_finder_tool
+slot_generator_tool.coroutine = _aslot_generator_tool
+slot_selection_tool.coroutine = _aslot_selection_tool
+budget_estimator_tool.coroutine = _abudget_estimator_tool
+batch_budget_estimator_tool.coroutine = _abatch_budget_estimator_tool
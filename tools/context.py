@@ -0,0 +1,153 @@
+import json
+import os
+import re
+from datetime import date, timedelta
+from itertools import groupby
+
+HANDLE_PATTERN = re.compile(r"^@r\d+$")
+DEFAULT_TOKEN_BUDGET = int(os.getenv("AGENT_CONTEXT_TOKENS", "6000"))
+KEEP_RECENT_MESSAGES = 6
+MAX_SUMMARY_LINES = 30
+CHARS_PER_TOKEN = 4
+
+def estimate_tokens(text):
+    # rough but stable; good enough to decide when to compact
+    return len(text) // CHARS_PER_TOKEN + 4
+
+def _short_name(name):
+    return (name or "").split(",")[0].strip()
+
+def _slot_ranges(slots):
+    """
+    Collapses a slot list into runs of days sharing the same daily pattern:
+    first start, last end and slots per day.
+    """
+    ranges = []
+    for day, day_slots in groupby(slots, key=lambda slot: slot["date"]):
+        day_slots = list(day_slots)
+        pattern = (day_slots[0]["start_time"], day_slots[-1]["end_time"], len(day_slots))
+        next_day = (date.fromisoformat(ranges[-1]["end_date"]) + timedelta(days=1)).isoformat() if ranges else None
+        if ranges and ranges[-1]["_pattern"] == pattern and day == next_day:
+            ranges[-1]["end_date"] = day
+            continue
+        ranges.append({"start_date": day, "end_date": day, "from": pattern[0], "to": pattern[1],
+                       "per_day": pattern[2], "_pattern": pattern})
+    for entry in ranges:
+        del entry["_pattern"]
+    return ranges
+
+class AgentContext:
+    """
+    Message history for the agent loop with bounded size.
+
+    Large tool results (venue and slot lists) are kept in a side store and shown to
+    the model in compact form under a handle such as "@r3". The model passes the handle
+    back as an argument and resolve() swaps in the full value before the tool runs.
+    When the estimated prompt size exceeds token_budget, the oldest turns are folded into
+    a single summary message.
+    """
+    def __init__(self, system_prompt, token_budget=DEFAULT_TOKEN_BUDGET, keep_recent=KEEP_RECENT_MESSAGES):
+        self.messages = [{"role": "system", "content": system_prompt}]
+        self.token_budget = token_budget
+        self.keep_recent = keep_recent
+        self.store = {}
+        self._summary = []
+
+    def _put(self, value):
+        handle = f"@r{len(self.store) + 1}"
+        self.store[handle] = value
+        return handle
+
+    def resolve(self, value):
+        """
+        Replaces handle strings anywhere inside tool arguments with the stored values.
+        """
+        if isinstance(value, str) and HANDLE_PATTERN.match(value):
+            return self.store.get(value, value)
+        if isinstance(value, dict):
+            return {k: self.resolve(v) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self.resolve(v) for v in value]
+        return value
+
+    def compact(self, tool_name, result):
+        """
+        Encodes a tool result with only the fields the model needs to decide its next step.
+        """
+        if not isinstance(result, dict):
+            return result
+        encoded = {}
+        for key, value in result.items():
+            if key == "feasible_slots" and isinstance(value, list):
+                encoded[key] = {"handle": self._put(value), "count": len(value), "ranges": _slot_ranges(value)}
+            elif key == "nearby_places" and isinstance(value, list):
+                encoded[key] = {
+                    "handle": self._put(value),
+                    "count": len(value),
+                    "venues": [{"id": i, "name": _short_name(place.get("name")), "type": place.get("type")}
+                               for i, place in enumerate(value)],
+                }
+            elif key == "ranked_slots" and isinstance(value, list):
+                encoded[key] = [f"{slot['date']} {slot['start_time']}-{slot['end_time']}" for slot in value]
+            elif key == "budget_estimates" and isinstance(value, list):
+                encoded[key] = [{"name": _short_name(b.get("place_name")), "total": b.get("total_budget"),
+                                 "per_person": b.get("per_person_cost")} for b in value]
+            else:
+                encoded[key] = value
+        return encoded
+
+    def add_user(self, content):
+        self.messages.append({"role": "user", "content": content})
+        self.enforce_budget()
+
+    def add_assistant(self, content):
+        self.messages.append({"role": "assistant", "content": content})
+
+    def add_tool_results(self, parsed, outcomes):
+        """
+        Appends the model's tool-call turn and one compact message with all results.
+        """
+        self.add_assistant(json.dumps(parsed))
+        if len(outcomes) == 1:
+            payload = self.compact(outcomes[0]["tool"], outcomes[0]["result"])
+        else:
+            payload = {o["id"]: self.compact(o["tool"], o["result"]) for o in outcomes}
+        self.messages.append({"role": "user", "content": json.dumps(payload, separators=(",", ":"))})
+        self.enforce_budget()
+
+    def token_count(self):
+        return sum(estimate_tokens(m["content"]) for m in self.messages)
+
+    def _summarize(self, message):
+        content = message["content"]
+        if message["role"] == "assistant":
+            try:
+                parsed = json.loads(content)
+            except (json.JSONDecodeError, TypeError):
+                return f"assistant said: {content[:120]}"
+            tools = [c.get("tool") for c in parsed.get("tool_calls", [parsed])]
+            return f"assistant called {', '.join(map(str, tools))}"
+        handles = re.findall(r'"handle":"(@r\d+)","count":(\d+)', content)
+        if handles:
+            return "results stored as " + ", ".join(f"{h} ({n} items)" for h, n in handles)
+        return f"user: {content[:160]}"
+
+    def enforce_budget(self):
+        """
+        Folds the oldest turns into one summary message until the context fits the budget,
+        always keeping the system prompt and the most recent keep_recent messages.
+        """
+        while self.token_count() > self.token_budget:
+            start = 2 if self._summary else 1
+            foldable = len(self.messages) - start - self.keep_recent
+            if foldable <= 0:
+                break
+            folded = self.messages[start:start + 2] if foldable >= 2 else self.messages[start:start + 1]
+            self._summary.extend(self._summarize(m) for m in folded)
+            self._summary = self._summary[-MAX_SUMMARY_LINES:]
+            del self.messages[start:start + len(folded)]
+            summary = {"role": "user", "content": "Summary of earlier steps:\n- " + "\n- ".join(self._summary)}
+            if start == 2:
+                self.messages[1] = summary
+            else:
+                self.messages.insert(1, summary)
@@ -0,0 +1,134 @@
+import contextvars
+import re
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from utils.logger import logger
+
+REF_PATTERN = re.compile(r"^\$([A-Za-z_][\w-]*)((?:\.[\w-]+)*)$")
+MAX_WORKERS = 4
+
+def normalize_calls(parsed):
+    """
+    Accepts either a single {"tool", "args"} call or {"tool_calls": [...]} and returns a
+    list of calls, each with an "id" (defaulting to its tool name, then its position).
+    """
+    if isinstance(parsed, list):
+        raw_calls = parsed
+    elif parsed.get("tool_calls"):
+        raw_calls = parsed["tool_calls"]
+    else:
+        raw_calls = [parsed]
+
+    calls, seen = [], set()
+    for position, call in enumerate(raw_calls):
+        call_id = str(call.get("id") or call.get("tool"))
+        if call_id in seen:
+            call_id = f"{call_id}_{position}"
+        seen.add(call_id)
+        calls.append({"id": call_id, "tool": call.get("tool"), "args": call.get("args", {}) or {}})
+    return calls
+
+def _references(value):
+    if isinstance(value, str):
+        match = REF_PATTERN.match(value)
+        return {match.group(1)} if match else set()
+    if isinstance(value, dict):
+        return set().union(*(_references(v) for v in value.values())) if value else set()
+    if isinstance(value, list):
+        return set().union(*(_references(v) for v in value)) if value else set()
+    return set()
+
+def _lookup(result, path):
+    for part in path:
+        if isinstance(result, list):
+            result = result[int(part)]
+        else:
+            result = result[part]
+    return result
+
+def resolve_args(value, results):
+    """
+    Replaces "$id" / "$id.field.0" references with the matching values from earlier results.
+    """
+    if isinstance(value, str):
+        match = REF_PATTERN.match(value)
+        if match and match.group(1) in results:
+            path = [p for p in match.group(2).split(".") if p]
+            return _lookup(results[match.group(1)], path)
+        return value
+    if isinstance(value, dict):
+        return {k: resolve_args(v, results) for k, v in value.items()}
+    if isinstance(value, list):
+        return [resolve_args(v, results) for v in value]
+    return value
+
+def build_graph(calls):
+    """
+    Returns {call_id: set of call_ids it depends on}. References to ids that are not
+    part of this batch are left alone and passed through as plain strings.
+    """
+    ids = {call["id"] for call in calls}
+    return {call["id"]: _references(call["args"]) & ids - {call["id"]} for call in calls}
+
+def execute_calls(calls, tools, max_workers=MAX_WORKERS, arg_resolver=None):
+    """
+    Runs a batch of tool calls, concurrently wherever their arguments allow.
+
+    A call waits only for the calls it references; independent calls run in parallel
+    in a thread pool. A failing call yields {"error": ...} for itself and for the calls
+    that depend on it, without stopping the rest of the batch.
+
+    Args:
+        calls (list): Calls as returned by normalize_calls.
+        tools (dict): Tool name to LangChain tool.
+        arg_resolver (callable, optional): Extra resolution applied to args before invocation.
+
+    Returns:
+        list: {"id", "tool", "result"} dicts in the order the calls were given.
+    """
+    graph = build_graph(calls)
+    by_id = {call["id"]: call for call in calls}
+    results = {}
+    pending = dict(graph)
+
+    def run(call):
+        tool = tools.get(call["tool"])
+        if tool is None:
+            return {"error": f"Unknown tool: {call['tool']}"}
+        args = resolve_args(call["args"], results)
+        if arg_resolver is not None:
+            args = arg_resolver(args)
+        return tool.invoke(args)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        running = {}
+        while pending or running:
+            ready = [cid for cid, deps in pending.items() if deps <= results.keys()]
+            while ready:
+                call_id = ready.pop(0)
+                deps = pending.pop(call_id)
+                failed = [d for d in deps if isinstance(results[d], dict) and "error" in results[d]]
+                if failed:
+                    results[call_id] = {"error": f"Skipped: dependency {failed[0]} failed"}
+                    ready += [cid for cid, d in pending.items() if d <= results.keys() and cid not in ready]
+                    continue
+                # each call runs in a copy of the caller's context so tracing spans keep their parent
+                running[pool.submit(contextvars.copy_context().run, run, by_id[call_id])] = call_id
+
+            if not running:
+                if pending:
+                    # whatever is left waits on itself through a cycle
+                    for call_id in pending:
+                        results[call_id] = {"error": "Dependency cycle between tool calls"}
+                    pending.clear()
+                break
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                call_id = running.pop(future)
+                try:
+                    results[call_id] = future.result()
+                except Exception as e:
+                    logger.error(f"Tool call {call_id} failed: {e}")
+                    results[call_id] = {"error": str(e)}
+
+    return [{"id": call["id"], "tool": call["tool"], "result": results[call["id"]]} for call in calls]
@@ -0,0 +1,197 @@
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+MISS = object()
+
+
+def normalize_key(text):
+    """
+    Normalizes free text into a stable cache key.
+    'Andheri  West, ' and 'andheri west' map to the same key.
+    """
+    text = re.sub(r"[^\w\s]", " ", str(text).lower())
+    return " ".join(text.split())
+
+
+class CacheStats:
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def as_dict(self):
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "negative_hits": self.negative_hits,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+
+class MemoryBackend:
+    """
+    In-process LRU store. Entries are (value, expires_at) pairs.
+    """
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key):
+        entry = self._data.get(key)
+        if entry is not None:
+            self._data.move_to_end(key)
+        return entry
+
+    def set(self, key, value, expires_at):
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key):
+        self._data.pop(key, None)
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteBackend:
+    """
+    On-disk store backed by a single SQLite table. Values are stored as JSON.
+    """
+    def __init__(self, path, table="cache"):
+        if not re.fullmatch(r"\w+", table):
+            raise ValueError(f"Invalid cache table name: {table}")
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.table = table
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                "(key TEXT PRIMARY KEY, value TEXT, expires_at REAL)"
+            )
+
+    def get(self, key):
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None:
+            return None
+        return json.loads(row[0]), row[1]
+
+    def set(self, key, value, expires_at):
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires_at),
+            )
+
+    def delete(self, key):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.table}").fetchone()[0]
+
+
+class TTLCache:
+    """
+    Two-tier cache: an in-process LRU in front of an optional persistent backend.
+
+    get() returns MISS when nothing usable is cached. A stored value of None is a
+    negative entry (e.g. "no results") and is returned as None on a hit.
+    """
+    def __init__(self, maxsize=1024, ttl=None, negative_ttl=None, persistent=None, clock=time.time):
+        self.memory = MemoryBackend(maxsize)
+        self.persistent = persistent
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl if negative_ttl is not None else ttl
+        self.clock = clock
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def _expired(self, expires_at):
+        return expires_at is not None and expires_at <= self.clock()
+
+    def _lookup(self, key):
+        entry = self.memory.get(key)
+        if entry is not None:
+            if not self._expired(entry[1]):
+                return entry
+            self.memory.delete(key)
+            self.stats.expirations += 1
+        if self.persistent is None:
+            return None
+        entry = self.persistent.get(key)
+        if entry is None:
+            return None
+        if self._expired(entry[1]):
+            self.persistent.delete(key)
+            self.stats.expirations += 1
+            return None
+        self._store_memory(key, entry[0], entry[1])
+        return entry
+
+    def _store_memory(self, key, value, expires_at):
+        before = self.memory.evictions
+        self.memory.set(key, value, expires_at)
+        self.stats.evictions += self.memory.evictions - before
+
+    def get(self, key):
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self.stats.misses += 1
+                return MISS
+            self.stats.hits += 1
+            if entry[0] is None:
+                self.stats.negative_hits += 1
+            return entry[0]
+
+    def set(self, key, value, ttl=None):
+        if ttl is None:
+            ttl = self.negative_ttl if value is None else self.ttl
+        expires_at = self.clock() + ttl if ttl is not None else None
+        with self._lock:
+            self._store_memory(key, value, expires_at)
+            if self.persistent is not None:
+                self.persistent.set(key, value, expires_at)
+
+    def set_negative(self, key, ttl=None):
+        self.set(key, None, ttl)
+
+    def delete(self, key):
+        with self._lock:
+            self.memory.delete(key)
+            if self.persistent is not None:
+                self.persistent.delete(key)
+
+    def clear(self):
+        with self._lock:
+            self.memory.clear()
+            if self.persistent is not None:
+                self.persistent.clear()
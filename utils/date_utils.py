@@ -12,12 +12,12 @@ def validate_date_format(date_str):
     except ValueError:
         return False
 
-import dateparser
-
 def parse_relative_date(relative_date_str, reference_date=None):
     """
     Converts 'day after tomorrow' to 'YYYY-MM-DD' format based on reference_date.
     """
+    import dateparser  # deferred: importing dateparser costs ~150 ms
+
     if reference_date is None:
         reference_date = datetime.today()
     parsed_date = dateparser.parse(relative_date_str, settings={'RELATIVE_BASE': reference_date})
@@ -0,0 +1,116 @@
+import asyncio
+import itertools
+import os
+import threading
+import weakref
+from urllib.parse import urlsplit
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from utils.tracing import span, increment, is_enabled
+
+DEFAULT_CONNECT_TIMEOUT = float(os.getenv("HTTP_CONNECT_TIMEOUT", "3.05"))
+DEFAULT_READ_TIMEOUT = float(os.getenv("HTTP_READ_TIMEOUT", "10"))
+POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+ASYNC_POOL_SIZE = int(os.getenv("HTTP_ASYNC_POOL_SIZE", "128"))
+# httpcore rescans every pooled connection for each queued request, so one large async
+# pool slows down under load; the connections are split across small client shards instead
+ASYNC_SHARD_SIZE = int(os.getenv("HTTP_ASYNC_SHARD_SIZE", "16"))
+ASYNC_ERRORS = (httpx.HTTPError, ValueError)
+
+_session = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """
+    Returns the process-wide requests session. Connections are pooled and kept
+    alive across calls, so repeated LocationIQ lookups skip the TCP/TLS handshake.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                _session = session
+    return _session
+
+def get(url, params=None, timeout=None):
+    """
+    GET through the shared session. timeout is seconds or a (connect, read) tuple;
+    it always has a finite default so a stalled upstream cannot hang a request.
+    """
+    if timeout is None:
+        timeout = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+    if not is_enabled():
+        return get_session().get(url, params=params, timeout=timeout)
+    parts = urlsplit(url)
+    with span("http.get", host=parts.netloc, path=parts.path) as s:
+        response = get_session().get(url, params=params, timeout=timeout)
+        s.set("status_code", response.status_code)
+        increment("http_requests_total", host=parts.netloc, status=response.status_code)
+        return response
+
+_async_pools = weakref.WeakKeyDictionary()
+
+class _AsyncPool:
+    """
+    Per-event-loop set of httpx clients, each with at most ASYNC_SHARD_SIZE connections
+    and a semaphore in front so excess requests queue here rather than inside httpcore.
+    """
+    def __init__(self, size=ASYNC_POOL_SIZE, shard_size=ASYNC_SHARD_SIZE):
+        shard_size = max(1, min(shard_size, size))
+        shards = max(1, size // shard_size)
+        limits = httpx.Limits(max_connections=shard_size, max_keepalive_connections=shard_size)
+        self.clients = [httpx.AsyncClient(limits=limits) for _ in range(shards)]
+        self.slots = [asyncio.Semaphore(shard_size) for _ in range(shards)]
+        self._next = itertools.count()
+
+    @property
+    def is_closed(self):
+        return self.clients[0].is_closed
+
+    async def get(self, url, params, timeout):
+        i = next(self._next) % len(self.clients)
+        async with self.slots[i]:
+            return await self.clients[i].get(url, params=params, timeout=timeout)
+
+    async def aclose(self):
+        for client in self.clients:
+            await client.aclose()
+
+def get_async_pool():
+    """
+    Returns the shared async connection pool for the running event loop. Every coroutine
+    on the loop shares it; a pool is never reused across loops.
+    """
+    loop = asyncio.get_running_loop()
+    pool = _async_pools.get(loop)
+    if pool is None or pool.is_closed:
+        pool = _async_pools[loop] = _AsyncPool()
+    return pool
+
+async def aclose_async_pool():
+    pool = _async_pools.pop(asyncio.get_running_loop(), None)
+    if pool is not None:
+        await pool.aclose()
+
+async def aget(url, params=None, timeout=None):
+    """
+    Async counterpart of get() over the shared pool. At most ASYNC_POOL_SIZE requests
+    are in flight per event loop; the rest wait their turn. Failures raise one of ASYNC_ERRORS.
+    """
+    if timeout is None:
+        timeout = (DEFAULT_CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+    if isinstance(timeout, tuple):
+        timeout = httpx.Timeout(timeout[1], connect=timeout[0])
+    if not is_enabled():
+        return await get_async_pool().get(url, params, timeout)
+    parts = urlsplit(url)
+    with span("http.get", host=parts.netloc, path=parts.path) as s:
+        response = await get_async_pool().get(url, params, timeout)
+        s.set("status_code", response.status_code)
+        increment("http_requests_total", host=parts.netloc, status=response.status_code)
+        return response
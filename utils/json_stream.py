@@ -0,0 +1,128 @@
+import json
+
+class IncrementalJSONExtractor:
+    """
+    Brace- and string-aware scanner that finds the first complete top-level JSON object
+    in text that may arrive in chunks.
+
+    feed() returns the parsed object as soon as its closing brace arrives, so a caller
+    can act on it before the rest of the completion has been generated. Text around the
+    object (prose, code fences) is ignored. A balanced candidate that is not valid JSON
+    is skipped and scanning continues; its error is kept in last_error. Call finish()
+    at the end of the input so that a stray, never-closed '{' is skipped as well.
+    """
+    __slots__ = ("_parts", "_depth", "_in_string", "_escape", "result", "last_error")
+
+    def __init__(self):
+        self._reset()
+        self.result = None
+        self.last_error = None
+
+    def _reset(self):
+        self._parts = []
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+
+    @property
+    def done(self):
+        return self.result is not None
+
+    def feed(self, chunk):
+        """
+        Consumes the next chunk. Returns the parsed object once the first one completes,
+        otherwise None. Only the text of the object being scanned is retained, and each
+        character is examined once (except after an invalid candidate).
+        """
+        if self.result is not None:
+            return self.result
+        if not chunk:
+            return None
+
+        data = chunk
+        i = 0
+        segment_start = 0
+        n = len(data)
+        while i < n:
+            if self._depth == 0:
+                # outside an object only an opening brace matters
+                i = data.find("{", i)
+                if i == -1:
+                    return None
+                segment_start = i
+                self._parts = []
+                self._depth = 1
+                i += 1
+                continue
+
+            ch = data[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    candidate = "".join(self._parts) + data[segment_start:i + 1]
+                    self._parts = []
+                    try:
+                        self.result = json.loads(candidate)
+                        return self.result
+                    except json.JSONDecodeError as e:
+                        self.last_error = (e, candidate)
+                        # not JSON after all; rescan from just after its opening brace
+                        data = candidate[1:] + data[i + 1:]
+                        n = len(data)
+                        i = 0
+                        self._in_string = False
+                        self._escape = False
+                        continue
+            i += 1
+
+        if self._depth > 0:
+            self._parts.append(data[segment_start:])
+        return None
+
+    def finish(self):
+        """
+        Marks the end of the input. An object still open at this point started at a
+        '{' that was never matched, so scanning resumes from the next '{' after it.
+        Returns the parsed object or None.
+        """
+        while self.result is None and self._depth > 0:
+            pending = "".join(self._parts)[1:]
+            self._reset()
+            self.feed(pending)
+        return self.result
+
+def extract_json(text):
+    """
+    Returns the first complete, valid top-level JSON object in text, or None.
+    """
+    extractor = IncrementalJSONExtractor()
+    extractor.feed(text)
+    return extractor.finish()
+
+def extract_json_from_stream(chunks):
+    """
+    Consumes an iterable of text chunks until the first JSON object closes.
+
+    Returns:
+        (parsed, text): the object (or None) and all text consumed so far.
+    """
+    extractor = IncrementalJSONExtractor()
+    consumed = []
+    for chunk in chunks:
+        if not chunk:
+            continue
+        consumed.append(chunk)
+        if extractor.feed(chunk) is not None:
+            break
+    return extractor.finish(), "".join(consumed)
@@ -0,0 +1,309 @@
+import asyncio
+import heapq
+import itertools
+import os
+import random
+import threading
+import time
+from utils.logger import logger
+from utils.tracing import span, increment
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_DEFAULT = 5
+PRIORITY_BATCH = 10
+
+class RateLimitExceeded(Exception):
+    """
+    Raised when a call is still rate limited after the gateway's retry cap.
+    """
+
+class TokenBucket:
+    """
+    Classic token bucket: capacity tokens, refilled continuously at capacity per period.
+    """
+    def __init__(self, capacity, period=60.0, clock=time.monotonic):
+        self.capacity = float(capacity)
+        self.rate = self.capacity / period
+        self.tokens = self.capacity
+        self.clock = clock
+        self.updated = clock()
+
+    def _refill(self):
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount):
+        """
+        Seconds until amount tokens are available (0 if they already are).
+        """
+        self._refill()
+        amount = min(amount, self.capacity)
+        return 0.0 if self.tokens >= amount else (amount - self.tokens) / self.rate
+
+    def consume(self, amount):
+        self._refill()
+        self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount):
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + min(amount, self.capacity))
+
+    def drain(self, seconds):
+        """
+        Empties the bucket and holds it empty for `seconds`, used when the server says to back off.
+        """
+        self._refill()
+        self.tokens = -seconds * self.rate
+
+def is_rate_limit_error(error):
+    if type(error).__name__ == "RateLimitError":
+        return True
+    status = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status == 429
+
+def retry_after_seconds(error):
+    value = getattr(error, "retry_after", None)
+    if value is None:
+        headers = getattr(getattr(error, "response", None), "headers", None) or {}
+        value = headers.get("retry-after")
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+def token_usage(result):
+    """
+    Prompt/completion token counts from a LangChain message or a Groq completion, if present.
+    """
+    usage = getattr(result, "usage_metadata", None)
+    if usage:
+        return {"prompt_tokens": usage.get("input_tokens", 0), "completion_tokens": usage.get("output_tokens", 0)}
+    usage = getattr(result, "usage", None)
+    if usage is not None and hasattr(usage, "prompt_tokens"):
+        return {"prompt_tokens": usage.prompt_tokens, "completion_tokens": usage.completion_tokens}
+    return None
+
+def estimate_prompt_tokens(payload):
+    if isinstance(payload, list):
+        text = " ".join(str(m.get("content", "")) if isinstance(m, dict) else str(m) for m in payload)
+    else:
+        text = str(payload)
+    return len(text) // 4 + 1
+
+class LLMGateway:
+    """
+    Single entry point for Groq calls from every code path in the process.
+
+    Calls wait in a priority queue (lower number first, FIFO within a priority) until
+    both the request-per-minute and token-per-minute buckets allow them. Rate-limit
+    errors are retried with jittered exponential backoff up to max_retries; a server
+    supplied retry-after instead pauses the shared buckets, so the retry and every
+    concurrent caller wait it out once in the queue rather than each sleeping on its own.
+    """
+    def __init__(self, requests_per_minute=30, tokens_per_minute=6000, max_retries=5,
+                 base_delay=1.0, max_delay=30.0, clock=time.monotonic, sleep=time.sleep):
+        self.requests = TokenBucket(requests_per_minute, 60.0, clock)
+        self.tokens = TokenBucket(tokens_per_minute, 60.0, clock)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.sleep = sleep
+        self._queue = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+        self.stats = {"calls": 0, "retries": 0, "rate_limited": 0, "queued_seconds": 0.0}
+
+    def _acquire(self, priority, tokens, claim=None):
+        """
+        Blocks until this call may go out and returns the seconds spent queued. claim is
+        shared with an async waiter (see _aacquire): once it is marked cancelled the ticket
+        leaves the queue without taking capacity and None is returned.
+        """
+        ticket = (priority, next(self._counter))
+        queued_at = time.monotonic()
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            while True:
+                if claim is not None and claim["cancelled"]:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                    self._cond.notify_all()
+                    return None
+                if self._queue[0] == ticket:
+                    wait = max(self.requests.wait_time(1), self.tokens.wait_time(tokens))
+                    if wait <= 0:
+                        self.requests.consume(1)
+                        self.tokens.consume(tokens)
+                        heapq.heappop(self._queue)
+                        if claim is not None:
+                            claim["acquired"] = True
+                        self._cond.notify_all()
+                        break
+                    self._cond.wait(timeout=wait)
+                else:
+                    self._cond.wait(timeout=0.5)
+        queued = time.monotonic() - queued_at
+        self._count("queued_seconds", queued)
+        return queued
+
+    def _count(self, key, value=1):
+        with self._cond:
+            self.stats[key] += value
+
+    async def _aacquire(self, priority, tokens):
+        """
+        _acquire() from a coroutine: waits in a worker thread so the loop keeps running.
+        If the awaiting task is cancelled, the ticket is withdrawn from the queue, or the
+        capacity it already took is handed back, so cancelled calls do not leak quota.
+        """
+        claim = {"cancelled": False, "acquired": False}
+        loop = asyncio.get_running_loop()
+        try:
+            return await loop.run_in_executor(None, self._acquire, priority, tokens, claim)
+        except asyncio.CancelledError:
+            with self._cond:
+                if claim["acquired"]:
+                    self.requests.refund(1)
+                    self.tokens.refund(tokens)
+                else:
+                    claim["cancelled"] = True
+                self._cond.notify_all()
+            raise
+
+    def backoff_delay(self, attempt):
+        ceiling = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return random.uniform(ceiling / 2, ceiling)
+
+    def _try_acquire(self, tokens):
+        """
+        Takes capacity without waiting if nobody is queued and both buckets allow it.
+        """
+        with self._cond:
+            if self._queue or max(self.requests.wait_time(1), self.tokens.wait_time(tokens)) > 0:
+                return False
+            self.requests.consume(1)
+            self.tokens.consume(tokens)
+            return True
+
+    def _on_rate_limit(self, error, attempt):
+        """
+        Books a rate-limit error and returns the backoff delay, or raises once retries are used up.
+        With a retry-after the delay is 0: the drained buckets hold the retry back in _acquire.
+        """
+        self._count("rate_limited")
+        increment("llm_rate_limited_total")
+        if attempt == self.max_retries:
+            raise RateLimitExceeded(f"Still rate limited after {self.max_retries} retries") from error
+        retry_after = retry_after_seconds(error)
+        if retry_after is not None:
+            with self._cond:
+                self.requests.drain(retry_after)
+            delay = 0.0
+        else:
+            delay = self.backoff_delay(attempt)
+        logger.warning(f"LLM rate limited, retry {attempt + 1}/{self.max_retries} in {retry_after or delay:.1f}s")
+        self._count("retries")
+        return delay
+
+    def _on_result(self, result, s):
+        usage = token_usage(result)
+        if usage:
+            s.update(**usage)
+            increment("llm_tokens_total", usage["prompt_tokens"], kind="prompt")
+            increment("llm_tokens_total", usage["completion_tokens"], kind="completion")
+        return result
+
+    def call(self, fn, *args, priority=PRIORITY_DEFAULT, estimated_tokens=None, **kwargs):
+        """
+        Runs fn(*args, **kwargs) under the limiter and retry policy.
+        """
+        if estimated_tokens is None:
+            estimated_tokens = estimate_prompt_tokens(args[0] if args else kwargs.get("messages", ""))
+        with span("llm.call", priority=priority, estimated_tokens=estimated_tokens) as s:
+            queued = 0.0
+            for attempt in range(self.max_retries + 1):
+                queued += self._acquire(priority, estimated_tokens)
+                self._count("calls")
+                s.update(attempts=attempt + 1, retries=attempt, queued_ms=round(queued * 1000, 3))
+                try:
+                    result = fn(*args, **kwargs)
+                except Exception as e:
+                    if not is_rate_limit_error(e):
+                        raise
+                    delay = self._on_rate_limit(e, attempt)
+                    if delay:
+                        self.sleep(delay)
+                    continue
+                return self._on_result(result, s)
+
+    async def acall(self, fn, *args, priority=PRIORITY_DEFAULT, estimated_tokens=None, **kwargs):
+        """
+        Async call(): awaits fn(*args, **kwargs) under the same limiter and retry policy.
+        Capacity is taken inline when it is free; only a call that must queue waits in a
+        worker thread, so sync and async callers share one queue and one set of buckets.
+        """
+        if estimated_tokens is None:
+            estimated_tokens = estimate_prompt_tokens(args[0] if args else kwargs.get("messages", ""))
+        with span("llm.call", priority=priority, estimated_tokens=estimated_tokens) as s:
+            queued = 0.0
+            for attempt in range(self.max_retries + 1):
+                if not self._try_acquire(estimated_tokens):
+                    queued += await self._aacquire(priority, estimated_tokens)
+                self._count("calls")
+                s.update(attempts=attempt + 1, retries=attempt, queued_ms=round(queued * 1000, 3))
+                try:
+                    result = await fn(*args, **kwargs)
+                except Exception as e:
+                    if not is_rate_limit_error(e):
+                        raise
+                    delay = self._on_rate_limit(e, attempt)
+                    if delay:
+                        await asyncio.sleep(delay)
+                    continue
+                return self._on_result(result, s)
+
+    def stream(self, fn, *args, priority=PRIORITY_DEFAULT, estimated_tokens=None, **kwargs):
+        """
+        Like call() for functions returning an iterator of chunks. The request only goes
+        out when the first chunk is pulled, so that pull happens under the limiter and
+        retry policy; the remaining chunks are yielded as they arrive.
+        """
+        def start():
+            iterator = iter(fn(*args, **kwargs))
+            return iterator, next(iterator, None)
+
+        iterator, first = self.call(start, priority=priority, estimated_tokens=(
+            estimated_tokens if estimated_tokens is not None
+            else estimate_prompt_tokens(args[0] if args else kwargs.get("messages", ""))
+        ))
+        if first is not None:
+            yield first
+        yield from iterator
+
+_gateway = None
+_gateway_lock = threading.Lock()
+
+def get_gateway():
+    """
+    Returns the process-wide gateway, sized from GROQ_RPM / GROQ_TPM / GROQ_MAX_RETRIES.
+    """
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway(
+                    requests_per_minute=int(os.getenv("GROQ_RPM", "30")),
+                    tokens_per_minute=int(os.getenv("GROQ_TPM", "6000")),
+                    max_retries=int(os.getenv("GROQ_MAX_RETRIES", "5")),
+                )
+    return _gateway
+
+def llm_call(fn, *args, priority=PRIORITY_DEFAULT, estimated_tokens=None, **kwargs):
+    return get_gateway().call(fn, *args, priority=priority, estimated_tokens=estimated_tokens, **kwargs)
+
+def llm_stream(fn, *args, priority=PRIORITY_DEFAULT, estimated_tokens=None, **kwargs):
+    return get_gateway().stream(fn, *args, priority=priority, estimated_tokens=estimated_tokens, **kwargs)
+
+async def allm_call(fn, *args, priority=PRIORITY_DEFAULT, estimated_tokens=None, **kwargs):
+    return await get_gateway().acall(fn, *args, priority=priority, estimated_tokens=estimated_tokens, **kwargs)
@@ -0,0 +1,69 @@
+import hashlib
+import io
+import os
+import zipfile
+from utils.cache import TTLCache, MISS
+
+PDF_CACHE_SIZE = int(os.getenv("PDF_CACHE_SIZE", "128"))
+
+_pdf_cache = TTLCache(maxsize=PDF_CACHE_SIZE)
+
+def _content_key(plan_text):
+    return hashlib.sha1(plan_text.encode("utf-8")).hexdigest()
+
+def _latin1(text):
+    # the core FPDF fonts are latin-1 only; unencodable characters become "?"
+    return text.encode("latin-1", "replace").decode("latin-1")
+
+def _new_document():
+    from fpdf import FPDF
+    pdf = FPDF()
+    pdf.set_font("Arial", size=12)
+    return pdf
+
+def _add_plan_page(pdf, plan_text):
+    pdf.add_page()
+    for line in plan_text.split("\n"):
+        pdf.cell(200, 10, txt=_latin1(line), ln=1)
+
+def _to_bytes(pdf):
+    # fpdf 1.7 returns a latin-1 str for dest="S"; fpdf2 returns a bytearray
+    data = pdf.output(dest="S")
+    return data.encode("latin-1") if isinstance(data, str) else bytes(data)
+
+def render_plan_pdf(plan_text):
+    """
+    Renders a plan to PDF bytes without touching the filesystem.
+    Identical plan text returns the cached bytes.
+    """
+    key = _content_key(plan_text)
+    cached = _pdf_cache.get(key)
+    if cached is not MISS:
+        return cached
+    pdf = _new_document()
+    _add_plan_page(pdf, plan_text)
+    data = _to_bytes(pdf)
+    _pdf_cache.set(key, data)
+    return data
+
+def render_plans_pdf(plan_texts):
+    """
+    Renders many plans into one PDF, one page per plan.
+    """
+    pdf = _new_document()
+    for plan_text in plan_texts:
+        _add_plan_page(pdf, plan_text)
+    return _to_bytes(pdf)
+
+def render_plans_zip(plan_texts, name_format="event_plan_{index:03d}.pdf"):
+    """
+    Renders each plan to its own PDF and returns a zip archive of them as bytes.
+    """
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for index, plan_text in enumerate(plan_texts, start=1):
+            archive.writestr(name_format.format(index=index), render_plan_pdf(plan_text))
+    return buffer.getvalue()
+
+def pdf_cache_stats():
+    return _pdf_cache.stats.as_dict()
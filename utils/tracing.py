@@ -0,0 +1,284 @@
+import atexit
+import contextvars
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+METRIC_PREFIX = "eventplanner"
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+RECENT_SPANS = 1000
+
+_enabled = os.getenv("TRACING_ENABLED", "false").lower() in ("1", "true", "yes")
+_current = contextvars.ContextVar("current_span", default=None)
+
+class _NoopSpan:
+    """
+    Returned while tracing is disabled, so instrumented code pays one flag check.
+    """
+    __slots__ = ()
+
+    def set(self, key, value):
+        return self
+
+    def update(self, **attributes):
+        return self
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+NOOP_SPAN = _NoopSpan()
+
+class Span:
+    __slots__ = ("name", "attributes", "parent", "start", "duration", "status", "_token", "_perf")
+
+    def __init__(self, name, attributes):
+        self.name = name
+        self.attributes = attributes
+        self.parent = None
+        self.start = None
+        self.duration = None
+        self.status = "ok"
+        self._token = None
+        self._perf = None
+
+    def set(self, key, value):
+        self.attributes[key] = value
+        return self
+
+    def update(self, **attributes):
+        self.attributes.update(attributes)
+        return self
+
+    def __enter__(self):
+        parent = _current.get()
+        self.parent = parent.name if parent is not None else None
+        self._token = _current.set(self)
+        self.start = time.time()
+        self._perf = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.duration = time.perf_counter() - self._perf
+        _current.reset(self._token)
+        if exc_type is not None:
+            self.status = "error"
+            self.attributes.setdefault("error", f"{exc_type.__name__}: {exc}")
+        registry.record_span(self)
+        return False
+
+    def as_dict(self):
+        return {
+            "name": self.name,
+            "parent": self.parent,
+            "start": self.start,
+            "duration_ms": round(self.duration * 1000, 3) if self.duration is not None else None,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+def _label_key(labels):
+    return tuple(sorted(labels.items()))
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+def _format_labels(labels, extra=None):
+    items = list(labels) + (list(extra.items()) if extra else [])
+    if not items:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in items) + "}"
+
+class MetricsRegistry:
+    """
+    Thread-safe counters and histograms plus a ring buffer of recently finished spans.
+    """
+    def __init__(self, buckets=DURATION_BUCKETS, recent=RECENT_SPANS):
+        self.buckets = buckets
+        self._counters = {}
+        self._histograms = {}
+        self._recent = deque(maxlen=recent)
+        self._lock = threading.Lock()
+
+    def increment(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    histogram["counts"][i] += 1
+                    break
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def record_span(self, span):
+        self.observe("span_duration_seconds", span.duration, span=span.name)
+        self.increment("span_total", span=span.name, status=span.status)
+        with self._lock:
+            self._recent.append(span)
+
+    def recent_spans(self, name=None):
+        with self._lock:
+            spans = list(self._recent)
+        return [s.as_dict() for s in spans if name is None or s.name == name]
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._recent.clear()
+
+    def snapshot(self):
+        """
+        Counters and histograms as plain data (histogram bucket counts are cumulative).
+        """
+        with self._lock:
+            counters = [{"name": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self._counters.items())]
+            histograms = []
+            for (name, labels), h in sorted(self._histograms.items()):
+                cumulative, running = {}, 0
+                for bound, count in zip(self.buckets, h["counts"]):
+                    running += count
+                    cumulative[str(bound)] = running
+                cumulative["+Inf"] = h["count"]
+                histograms.append({"name": name, "labels": dict(labels), "buckets": cumulative,
+                                   "sum": h["sum"], "count": h["count"]})
+        return {"counters": counters, "histograms": histograms}
+
+    def render_prometheus(self):
+        """
+        Prometheus text exposition format (version 0.0.4).
+        """
+        snapshot = self.snapshot()
+        lines, typed = [], set()
+        for counter in snapshot["counters"]:
+            name = f"{METRIC_PREFIX}_{counter['name']}"
+            if name not in typed:
+                lines.append(f"# TYPE {name} counter")
+                typed.add(name)
+            lines.append(f"{name}{_format_labels(counter['labels'].items())} {counter['value']}")
+        for histogram in snapshot["histograms"]:
+            name = f"{METRIC_PREFIX}_{histogram['name']}"
+            if name not in typed:
+                lines.append(f"# TYPE {name} histogram")
+                typed.add(name)
+            labels = histogram["labels"].items()
+            for bound, count in histogram["buckets"].items():
+                lines.append(f"{name}_bucket{_format_labels(labels, {'le': bound})} {count}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {histogram['sum']:.6f}")
+            lines.append(f"{name}_count{_format_labels(labels)} {histogram['count']}")
+        return "\n".join(lines) + "\n"
+
+    def write_json(self, path):
+        data = dict(self.snapshot(), recent_spans=self.recent_spans())
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=2, default=str)
+
+registry = MetricsRegistry()
+
+def is_enabled():
+    return _enabled
+
+def enable(flag=True):
+    global _enabled
+    _enabled = bool(flag)
+
+def span(name, **attributes):
+    """
+    Times a block as a named span. Attributes can be added on the returned span with
+    set()/update(); on exit its duration and status feed the span metrics.
+    """
+    if not _enabled:
+        return NOOP_SPAN
+    return Span(name, attributes)
+
+def current_span():
+    """
+    The innermost open span in this context, or a no-op span.
+    """
+    if not _enabled:
+        return NOOP_SPAN
+    return _current.get() or NOOP_SPAN
+
+def increment(name, value=1, **labels):
+    if _enabled:
+        registry.increment(name, value, **labels)
+
+def traced(name=None):
+    """
+    Decorator that runs the function inside span(name); name defaults to the function name.
+    Works on coroutine functions too, timing the whole await.
+    """
+    def decorator(fn):
+        span_name = name or fn.__name__
+
+        if inspect.iscoroutinefunction(fn):
+            @functools.wraps(fn)
+            async def async_wrapper(*args, **kwargs):
+                if not _enabled:
+                    return await fn(*args, **kwargs)
+                with Span(span_name, {}):
+                    return await fn(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            with Span(span_name, {}):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.startswith("/metrics"):
+            body, content_type = registry.render_prometheus().encode("utf-8"), "text/plain; version=0.0.4"
+        elif self.path.startswith("/spans"):
+            body, content_type = json.dumps(registry.recent_spans(), default=str).encode("utf-8"), "application/json"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+_metrics_server = None
+_metrics_server_lock = threading.Lock()
+
+def start_metrics_server(port=9464, host="127.0.0.1"):
+    """
+    Serves /metrics (Prometheus text) and /spans (recent spans as JSON) from a daemon thread.
+    """
+    global _metrics_server
+    with _metrics_server_lock:
+        if _metrics_server is None:
+            _metrics_server = ThreadingHTTPServer((host, port), _MetricsHandler)
+            _metrics_server.daemon_threads = True
+            threading.Thread(target=_metrics_server.serve_forever, daemon=True).start()
+    return _metrics_server
+
+if _enabled:
+    if os.getenv("TRACING_METRICS_PORT"):
+        start_metrics_server(int(os.getenv("TRACING_METRICS_PORT")))
+    if os.getenv("TRACING_METRICS_PATH"):
+        atexit.register(registry.write_json, os.getenv("TRACING_METRICS_PATH"))
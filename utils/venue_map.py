@@ -0,0 +1,49 @@
+import html
+import os
+
+CLUSTER_THRESHOLD = int(os.getenv("MAP_CLUSTER_THRESHOLD", "15"))
+SINGLE_VENUE_ZOOM = 15
+
+def venue_points(venues):
+    """
+    Reduces venue dicts to a hashable tuple of (name, lat, lon), skipping entries
+    without usable coordinates. Used both as the map cache key and as map input.
+    """
+    points = []
+    for place in venues:
+        try:
+            lat, lon = float(place["latitude"]), float(place["longitude"])
+        except (KeyError, TypeError, ValueError):
+            continue
+        points.append((place.get("name") or "", lat, lon))
+    return tuple(points)
+
+def build_venue_map(points, cluster_threshold=CLUSTER_THRESHOLD):
+    """
+    Builds a folium map fitted to all points. Above cluster_threshold markers are
+    grouped with MarkerCluster so the browser only draws what is visible at each zoom.
+    """
+    import folium
+    lats = [p[1] for p in points]
+    lons = [p[2] for p in points]
+    center = [sum(lats) / len(lats), sum(lons) / len(lons)]
+    m = folium.Map(location=center, zoom_start=SINGLE_VENUE_ZOOM)
+
+    layer = m
+    if len(points) > cluster_threshold:
+        from folium.plugins import MarkerCluster
+        layer = MarkerCluster().add_to(m)
+    for name, lat, lon in points:
+        folium.Marker([lat, lon], popup=html.escape(name), tooltip=html.escape(name)).add_to(layer)
+
+    if len(points) > 1:
+        m.fit_bounds([[min(lats), min(lons)], [max(lats), max(lons)]])
+    return m
+
+def render_venue_map_html(points, cluster_threshold=CLUSTER_THRESHOLD):
+    """
+    Returns the standalone HTML for the venue map, or None when there is nothing to plot.
+    """
+    if not points:
+        return None
+    return build_venue_map(points, cluster_threshold).get_root().render()